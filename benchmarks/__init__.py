@@ -0,0 +1,9 @@
+"""
+Benchmarks for the DOCX to Markdown converter.
+
+Synthetic documents are generated with python-docx (see corpus.py) and converted
+with DocxToMarkdownConverter; results are stored as JSON so runs can be compared
+over time (see run.py). Run from the repository root:
+
+    python -m benchmarks.run --preset small
+"""
@@ -0,0 +1,250 @@
+"""
+Synthetic .docx corpus generator.
+
+Documents are built with python-docx from a CorpusSpec describing their shape:
+number of paragraphs, runs per paragraph, hyperlink density, list depth, table
+size (with merged cells), image count and image size.
+"""
+
+import io
+import json
+import os
+import random
+import struct
+import zlib
+from typing import Any, Dict, List, Optional
+
+try:
+    from docx import Document
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+except ImportError:
+    print("Error: Missing required library. Please run: pip install python-docx")
+    import sys
+    sys.exit(1)
+
+RT_HYPERLINK = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink'
+
+WORDS = ('lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing',
+         'elit', 'sed', 'do', 'eiusmod', 'tempor', 'incididunt', 'labore')
+
+
+class CorpusSpec:
+    """Shape of one synthetic document"""
+
+    def __init__(self, name: str, paragraphs: int = 100, runs_per_paragraph: int = 4,
+                 hyperlink_density: float = 0.0, list_depth: int = 0, list_items: int = 0,
+                 table_rows: int = 0, table_cols: int = 0, merged_cells: bool = False,
+                 images: int = 0, image_pixels: int = 16, seed: int = 0):
+        """
+        Args:
+            name: Name of the document (file stem)
+            paragraphs: Number of body paragraphs
+            runs_per_paragraph: Formatted runs in each body paragraph
+            hyperlink_density: Fraction of runs wrapped in an external hyperlink
+            list_depth: Deepest list level used by list items (0 = no lists)
+            list_items: Number of list paragraphs, cycling through the levels
+            table_rows: Rows of the table (0 = no table)
+            table_cols: Columns of the table
+            merged_cells: Merge cells horizontally and vertically in the table
+            images: Number of inline images
+            image_pixels: Side of each (square, incompressible) PNG image
+            seed: Random seed, the same spec always produces the same document
+        """
+        self.name = name
+        self.paragraphs = paragraphs
+        self.runs_per_paragraph = runs_per_paragraph
+        self.hyperlink_density = hyperlink_density
+        self.list_depth = list_depth
+        self.list_items = list_items
+        self.table_rows = table_rows
+        self.table_cols = table_cols
+        self.merged_cells = merged_cells
+        self.images = images
+        self.image_pixels = image_pixels
+        self.seed = seed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CorpusSpec':
+        return cls(**data)
+
+    def scaled(self, factor: float, name: Optional[str] = None) -> 'CorpusSpec':
+        """Copy of the spec with every size multiplied by factor"""
+        data = self.to_dict()
+        for key in ('paragraphs', 'list_items', 'table_rows', 'images'):
+            data[key] = int(data[key] * factor)
+        data['name'] = name or f"{self.name}_x{factor:g}"
+        return CorpusSpec.from_dict(data)
+
+
+PRESETS: Dict[str, List[CorpusSpec]] = {
+    'small': [
+        CorpusSpec('text', paragraphs=500, runs_per_paragraph=4),
+        CorpusSpec('links', paragraphs=300, runs_per_paragraph=8, hyperlink_density=0.3),
+        CorpusSpec('lists', paragraphs=50, list_depth=5, list_items=500),
+        CorpusSpec('table', paragraphs=10, table_rows=200, table_cols=8, merged_cells=True),
+        CorpusSpec('images', paragraphs=50, images=50, image_pixels=64),
+    ],
+    'medium': [
+        CorpusSpec('text', paragraphs=5000, runs_per_paragraph=6),
+        CorpusSpec('links', paragraphs=3000, runs_per_paragraph=10, hyperlink_density=0.3),
+        CorpusSpec('lists', paragraphs=500, list_depth=8, list_items=5000),
+        CorpusSpec('table', paragraphs=50, table_rows=2000, table_cols=10, merged_cells=True),
+        CorpusSpec('images', paragraphs=500, images=500, image_pixels=128),
+        CorpusSpec('mixed', paragraphs=3000, runs_per_paragraph=6, hyperlink_density=0.1,
+                   list_depth=3, list_items=1000, table_rows=500, table_cols=6,
+                   merged_cells=True, images=100, image_pixels=64),
+    ],
+    'large': [
+        CorpusSpec('text', paragraphs=50000, runs_per_paragraph=6),
+        CorpusSpec('links', paragraphs=20000, runs_per_paragraph=10, hyperlink_density=0.3),
+        CorpusSpec('table', paragraphs=100, table_rows=10000, table_cols=10, merged_cells=True),
+        CorpusSpec('images', paragraphs=2000, images=2000, image_pixels=256),
+    ],
+}
+
+
+def generate_docx(spec: CorpusSpec, path: str) -> str:
+    """Build the document described by spec and save it to path"""
+    rng = random.Random(spec.seed)
+    doc = Document()
+
+    doc.add_heading(f"Benchmark {spec.name}", 1)
+
+    # Body paragraphs with mixed formatting and hyperlinks
+    for i in range(spec.paragraphs):
+        if i and i % 50 == 0:
+            doc.add_heading(f"Section {i // 50}", 2)
+        paragraph = doc.add_paragraph()
+        for j in range(spec.runs_per_paragraph):
+            text = _sentence(rng) + ' '
+            if spec.hyperlink_density and rng.random() < spec.hyperlink_density:
+                _add_hyperlink(paragraph, f"https://example.com/{i}/{j}", text)
+                continue
+            run = paragraph.add_run(text)
+            style = j % 4
+            run.bold = style == 1
+            run.italic = style == 2
+            run.underline = style == 3
+
+    # Lists cycling through levels 1..list_depth
+    for i in range(spec.list_items if spec.list_depth else 0):
+        level = i % spec.list_depth
+        style = 'List Bullet' if (i // spec.list_depth) % 2 == 0 else 'List Number'
+        if level:
+            style = f"{style} {min(level + 1, 3)}"
+        paragraph = doc.add_paragraph(_sentence(rng), style=style)
+        if level >= 3:
+            # Built-in list styles stop at level 3, deeper levels use direct numbering
+            _set_list_level(paragraph, level)
+
+    if spec.table_rows and spec.table_cols:
+        _add_table(doc, spec, rng)
+
+    for i in range(spec.images):
+        doc.add_paragraph(f"Figure {i + 1}")
+        doc.add_picture(io.BytesIO(make_png(spec.image_pixels, rng)))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    doc.save(path)
+    return path
+
+
+def ensure_corpus(specs: List[CorpusSpec], corpus_dir: str) -> Dict[str, str]:
+    """
+    Generate the documents of specs into corpus_dir unless already present
+
+    A document is regenerated when its spec changed since it was generated.
+
+    Returns:
+        Mapping of spec name to document path
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    paths = {}
+    for spec in specs:
+        path = os.path.join(corpus_dir, f"{spec.name}.docx")
+        spec_path = os.path.join(corpus_dir, f"{spec.name}.json")
+        current = json.dumps(spec.to_dict(), sort_keys=True)
+        try:
+            with open(spec_path, 'r', encoding='utf-8') as f:
+                up_to_date = f.read() == current and os.path.exists(path)
+        except OSError:
+            up_to_date = False
+
+        if not up_to_date:
+            generate_docx(spec, path)
+            with open(spec_path, 'w', encoding='utf-8') as f:
+                f.write(current)
+        paths[spec.name] = path
+    return paths
+
+
+def _sentence(rng: random.Random, words: int = 8) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def _add_hyperlink(paragraph: Any, url: str, text: str) -> None:
+    rel_id = paragraph.part.relate_to(url, RT_HYPERLINK, is_external=True)
+    hyperlink = OxmlElement('w:hyperlink')
+    hyperlink.set(qn('r:id'), rel_id)
+    run = OxmlElement('w:r')
+    text_element = OxmlElement('w:t')
+    text_element.text = text
+    text_element.set(qn('xml:space'), 'preserve')
+    run.append(text_element)
+    hyperlink.append(run)
+    paragraph._p.append(hyperlink)
+
+
+def _set_list_level(paragraph: Any, level: int) -> None:
+    pPr = paragraph._p.get_or_add_pPr()
+    numPr = OxmlElement('w:numPr')
+    ilvl = OxmlElement('w:ilvl')
+    ilvl.set(qn('w:val'), str(min(level, 8)))
+    num_id = OxmlElement('w:numId')
+    num_id.set(qn('w:val'), '1')
+    numPr.append(ilvl)
+    numPr.append(num_id)
+    pPr.append(numPr)
+
+
+def _add_table(doc: Any, spec: CorpusSpec, rng: random.Random) -> None:
+    table = doc.add_table(rows=spec.table_rows, cols=spec.table_cols)
+    # Fill through the XML cells: table.cell() is quadratic on large tables
+    for tr in table._tbl.tr_lst:
+        for tc in tr.tc_lst:
+            tc.p_lst[0].append(_text_run(_sentence(rng, 3)))
+
+    if spec.merged_cells and spec.table_cols >= 3 and spec.table_rows >= 4:
+        # Horizontal merge in every 5th row, vertical merge of the last column in pairs
+        for row in range(1, spec.table_rows - 1, 5):
+            table.cell(row, 0).merge(table.cell(row, 1))
+            table.cell(row + 1, spec.table_cols - 1).merge(
+                table.cell(row + 2, spec.table_cols - 1))
+
+
+def _text_run(text: str) -> Any:
+    run = OxmlElement('w:r')
+    text_element = OxmlElement('w:t')
+    text_element.text = text
+    run.append(text_element)
+    return run
+
+
+def make_png(side: int, rng: random.Random) -> bytes:
+    """Square RGB PNG of random (incompressible) pixels"""
+    row_bytes = side * 3
+    raw = b''.join(b'\x00' + bytes(rng.getrandbits(8) for _ in range(row_bytes))
+                   for _ in range(side))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (struct.pack('>I', len(data)) + kind + data +
+                struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    return (b'\x89PNG\r\n\x1a\n' +
+            chunk(b'IHDR', struct.pack('>IIBBBBB', side, side, 8, 2, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(raw, 1)) +
+            chunk(b'IEND', b''))
@@ -0,0 +1,207 @@
+"""
+Differential equivalence harness between converter engines and option sets.
+
+Every document is converted with a baseline and a candidate set of
+DocxToMarkdownConverter options. Markdown is normalized (image references are
+replaced by the content hash of the referenced file, so naming schemes don't
+matter) and compared together with the set of written image contents, so
+deduplicating identical images is not a difference. Times are shown
+side by side, and the script exits non-zero when any document differs, so it
+can gate performance work:
+
+    python -m benchmarks.differential docs/*.docx --candidate engine=iterparse
+    python -m benchmarks.differential --preset small --candidate lazy_package=true hash_image_names=true
+"""
+
+import argparse
+import difflib
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .corpus import PRESETS, ensure_corpus
+from .run import DEFAULT_CORPUS_DIR
+
+IMAGE_REFERENCE_PATTERN = re.compile(r'!\[([^\]]*)\]\(([^)\s]+)\)')
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Main function"""
+    parser = argparse.ArgumentParser(
+        description='Compare Markdown and assets produced by two converter configurations')
+    parser.add_argument('inputs', nargs='*', help='Input .docx/.doc files (supports wildcards)')
+    parser.add_argument('--preset', choices=sorted(PRESETS),
+                        help='Also compare the synthetic corpus of this benchmark preset')
+    parser.add_argument('--baseline', nargs='*', default=[], metavar='KEY=VALUE',
+                        help='Converter options of the baseline (default: defaults)')
+    parser.add_argument('--candidate', nargs='*', default=[], metavar='KEY=VALUE',
+                        help='Converter options of the candidate, e.g. engine=iterparse')
+    parser.add_argument('--report', metavar='FILE', help='Also write the results as JSON')
+    parser.add_argument('--context', type=int, default=2,
+                        help='Context lines of Markdown diffs (default: 2)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    inputs = []
+    for pattern in args.inputs:
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            print(f"No matching files found: {pattern}")
+        inputs.extend(matches)
+    if args.preset:
+        paths = ensure_corpus(PRESETS[args.preset],
+                              os.path.join(DEFAULT_CORPUS_DIR, args.preset))
+        inputs.extend(paths.values())
+    if not inputs:
+        parser.error('no input documents')
+
+    baseline = parse_options(args.baseline)
+    candidate = parse_options(args.candidate)
+    print(f"baseline:  {baseline or 'defaults'}")
+    print(f"candidate: {candidate or 'defaults'}\n")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='word2md_diff_') as work_dir:
+        for index, path in enumerate(inputs):
+            result = compare_document(path, baseline, candidate,
+                                      os.path.join(work_dir, str(index)), args.context)
+            results.append(result)
+            _print_result(result)
+
+    differing = [result for result in results if not result['equal']]
+    total_baseline = sum(result['baseline_seconds'] or 0 for result in results)
+    total_candidate = sum(result['candidate_seconds'] or 0 for result in results)
+    print(f"\n{len(results) - len(differing)} of {len(results)} documents equivalent, "
+          f"total {total_baseline:.3f}s vs {total_candidate:.3f}s")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'baseline': baseline, 'candidate': candidate, 'results': results},
+                      f, indent=2)
+
+    if differing:
+        sys.exit(1)
+
+
+def parse_options(items: List[str]) -> Dict[str, Any]:
+    """Parse KEY=VALUE items; values are read as JSON when possible (true, 3, null)"""
+    options = {}
+    for item in items:
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise SystemExit(f"Invalid option (expected KEY=VALUE): {item}")
+        try:
+            options[key] = json.loads(value)
+        except ValueError:
+            options[key] = value
+    return options
+
+
+def compare_document(path: str, baseline: Dict[str, Any], candidate: Dict[str, Any],
+                     work_dir: str, context: int = 2) -> Dict[str, Any]:
+    """Convert path with both option sets and compare the normalized outputs"""
+    base_markdown, base_assets, base_seconds, base_error = _convert(
+        path, baseline, os.path.join(work_dir, 'baseline'))
+    cand_markdown, cand_assets, cand_seconds, cand_error = _convert(
+        path, candidate, os.path.join(work_dir, 'candidate'))
+
+    markdown_diff = list(difflib.unified_diff(
+        base_markdown.splitlines(), cand_markdown.splitlines(),
+        'baseline', 'candidate', n=context, lineterm=''))
+    missing_assets = sorted(set(base_assets) - set(cand_assets))
+    extra_assets = sorted(set(cand_assets) - set(base_assets))
+
+    return {
+        'input': path,
+        'equal': (not markdown_diff and not missing_assets and not extra_assets
+                  and base_error == cand_error),
+        'baseline_seconds': base_seconds,
+        'candidate_seconds': cand_seconds,
+        'baseline_error': base_error,
+        'candidate_error': cand_error,
+        'markdown_diff': markdown_diff,
+        'missing_assets': missing_assets,
+        'extra_assets': extra_assets,
+    }
+
+
+def normalize_markdown(markdown: str, markdown_dir: str) -> str:
+    """Normalize line endings/trailing spaces and replace image paths by content hashes"""
+    def image_hash(match: 're.Match') -> str:
+        target = os.path.join(markdown_dir, match.group(2))
+        try:
+            with open(target, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:16]
+        except OSError:
+            digest = f"missing:{os.path.basename(match.group(2))}"
+        return f"![{match.group(1)}](sha256:{digest})"
+
+    markdown = markdown.replace('\r\n', '\n')
+    markdown = IMAGE_REFERENCE_PATTERN.sub(image_hash, markdown)
+    return '\n'.join(line.rstrip() for line in markdown.split('\n')).strip() + '\n'
+
+
+def _convert(path: str, options: Dict[str, Any],
+             output_dir: str) -> Tuple[str, Dict[str, int], Optional[float], Optional[str]]:
+    """
+    Convert path into output_dir
+
+    Returns:
+        (normalized Markdown, content hash -> number of image files, seconds, error)
+    """
+    from docx_converter import DocxToMarkdownConverter
+
+    output_path = os.path.join(output_dir, 'out.md')
+    try:
+        converter = DocxToMarkdownConverter(**options)
+        start = time.perf_counter()
+        converter.convert_file(path, output_path, return_content=False)
+        seconds = time.perf_counter() - start
+    except Exception as e:
+        return '', {}, None, f"{type(e).__name__}: {e}"
+
+    with open(output_path, 'r', encoding='utf-8') as f:
+        markdown = normalize_markdown(f.read(), output_dir)
+
+    assets: Dict[str, int] = {}
+    assets_dir = os.path.join(output_dir, 'assets')
+    if os.path.isdir(assets_dir):
+        for name in sorted(os.listdir(assets_dir)):
+            with open(os.path.join(assets_dir, name), 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:16]
+            assets[digest] = assets.get(digest, 0) + 1
+
+    return markdown, assets, round(seconds, 6), None
+
+
+def _print_result(result: Dict[str, Any]) -> None:
+    status = 'same' if result['equal'] else 'DIFF'
+    base = result['baseline_seconds']
+    cand = result['candidate_seconds']
+    timing = (f"{base:8.3f}s {cand:8.3f}s" if base is not None and cand is not None
+              else f"{'-':>9} {'-':>9}")
+    print(f"{status:<5} {timing}  {result['input']}")
+    if result['equal']:
+        return
+
+    for side in ('baseline', 'candidate'):
+        if result[f'{side}_error']:
+            print(f"      {side} failed: {result[f'{side}_error']}")
+    for line in result['markdown_diff']:
+        print(f"      {line}")
+    if result['missing_assets']:
+        print(f"      images only in baseline: {', '.join(result['missing_assets'])}")
+    if result['extra_assets']:
+        print(f"      images only in candidate: {', '.join(result['extra_assets'])}")
+
+
+if __name__ == '__main__':
+    main()
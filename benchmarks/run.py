@@ -0,0 +1,218 @@
+"""
+Throughput and peak memory benchmark of DocxToMarkdownConverter.
+
+Each document of a preset is converted in a fresh child process (so peak RSS
+belongs to that conversion alone) and the results are written as JSON. Where
+the resource module is unavailable (Windows) the tracemalloc peak of the
+Python heap is reported as peak_heap_mb instead; it is not comparable with
+peak_rss_mb:
+
+    python -m benchmarks.run --preset small
+    python -m benchmarks.run --preset medium --engine iterparse --compare benchmarks/results/old.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from .corpus import PRESETS, ensure_corpus
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_CORPUS_DIR = os.path.join(tempfile.gettempdir(), 'word2md_bench_corpus')
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Main function"""
+    parser = argparse.ArgumentParser(
+        description='Benchmark DOCX to Markdown conversion on a synthetic corpus')
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='small',
+                        help='Corpus preset (default: small)')
+    parser.add_argument('--only', nargs='+', metavar='NAME',
+                        help='Only run these documents of the preset')
+    parser.add_argument('--repeat', type=int, default=3, metavar='N',
+                        help='Conversions per document, the median is reported (default: 3)')
+    parser.add_argument('--corpus-dir', default=DEFAULT_CORPUS_DIR, metavar='DIR',
+                        help='Where generated documents are kept between runs')
+    parser.add_argument('--engine', choices=['dom', 'iterparse'], default='dom')
+    parser.add_argument('--lazy-package', action='store_true')
+    parser.add_argument('--lazy-images', action='store_true')
+    parser.add_argument('--hash-image-names', action='store_true')
+    parser.add_argument('--text-only', action='store_true')
+    parser.add_argument('-o', '--output', metavar='FILE',
+                        help='Results file (default: benchmarks/results/<preset>-<time>.json)')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='Print the change against an earlier results file')
+    args = parser.parse_args(argv)
+
+    options = {
+        'engine': args.engine,
+        'lazy_package': args.lazy_package,
+        'lazy_images': args.lazy_images,
+        'hash_image_names': args.hash_image_names,
+        'text_only': args.text_only,
+    }
+
+    specs = [spec for spec in PRESETS[args.preset]
+             if not args.only or spec.name in args.only]
+    print(f"Preparing corpus in {args.corpus_dir} ...")
+    paths = ensure_corpus(specs, os.path.join(args.corpus_dir, args.preset))
+
+    results = []
+    for spec in specs:
+        result = benchmark_document(paths[spec.name], options, args.repeat)
+        result['name'] = spec.name
+        result['spec'] = spec.to_dict()
+        results.append(result)
+        print(_format_result(result))
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'preset': args.preset,
+        'options': options,
+        'repeat': args.repeat,
+        'environment': _environment(),
+        'results': results,
+    }
+
+    output_path = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"{args.preset}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to: {output_path}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print_comparison(json.load(f), report)
+
+
+def benchmark_document(path: str, options: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    """Convert path repeat times, each in a fresh process, and summarize the runs"""
+    runs = [_run_in_child(path, options) for _ in range(max(repeat, 1))]
+    seconds = statistics.median(run['seconds'] for run in runs)
+    input_bytes = os.path.getsize(path)
+    counters = runs[0]['stats']['counters']
+
+    return {
+        'input_bytes': input_bytes,
+        'seconds': round(seconds, 6),
+        'seconds_min': round(min(run['seconds'] for run in runs), 6),
+        'paragraphs_per_s': round(counters['paragraphs'] / seconds, 1) if seconds else None,
+        'mb_per_s': round(input_bytes / (1024 * 1024) / seconds, 3) if seconds else None,
+        'peak_rss_mb': _peak(runs, 'peak_rss_mb'),
+        'peak_heap_mb': _peak(runs, 'peak_heap_mb'),
+        'stats': runs[0]['stats'],
+    }
+
+
+def print_comparison(old: Dict[str, Any], new: Dict[str, Any]) -> None:
+    """Print time and memory ratios of new against old per document"""
+    old_results = {result['name']: result for result in old.get('results', [])}
+    print(f"\n{'document':<12} {'time':>10} {'peak RSS':>10} {'peak heap':>10}")
+    for result in new['results']:
+        before = old_results.get(result['name'])
+        if not before:
+            continue
+        # Memory is only compared with the same metric
+        print(f"{result['name']:<12} {_ratio(before['seconds'], result['seconds']):>10} "
+              f"{_ratio(before.get('peak_rss_mb'), result.get('peak_rss_mb')):>10} "
+              f"{_ratio(before.get('peak_heap_mb'), result.get('peak_heap_mb')):>10}")
+
+
+def _peak(runs: List[Dict[str, Any]], key: str) -> Optional[float]:
+    """Largest value of a memory metric over the runs, None if it wasn't measured"""
+    values = [run[key] for run in runs if run.get(key) is not None]
+    return max(values) if values else None
+
+
+def _ratio(before: Optional[float], after: Optional[float]) -> str:
+    if not before or after is None:
+        return 'n/a'
+    return f"{(after / before - 1) * 100:+.1f}%"
+
+
+def _run_in_child(path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_child_convert, args=(path, options, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    if 'error' in result:
+        raise RuntimeError(f"Benchmark of {path} failed: {result['error']}")
+    return result
+
+
+def _child_convert(path: str, options: Dict[str, Any], queue: Any) -> None:
+    """Convert one document in this (fresh) process and report time, memory and stats"""
+    try:
+        from docx_converter import DocxToMarkdownConverter
+
+        tracemalloc = None
+        if resource is None:
+            import tracemalloc
+            tracemalloc.start()
+
+        with tempfile.TemporaryDirectory(prefix='word2md_bench_') as output_dir:
+            converter = DocxToMarkdownConverter(**options)
+            start = time.perf_counter()
+            converter.convert_file(path, os.path.join(output_dir, 'out.md'),
+                                   return_content=False)
+            seconds = time.perf_counter() - start
+
+        memory = {}
+        if tracemalloc is not None:
+            # Python heap only, reported under its own key
+            memory['peak_heap_mb'] = round(
+                tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        else:
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+            peak_rss_mb = max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+            memory['peak_rss_mb'] = round(peak_rss_mb, 1)
+
+        queue.put({'seconds': seconds, **memory, 'stats': converter.stats.to_dict()})
+    except Exception as e:
+        queue.put({'error': f"{type(e).__name__}: {e}"})
+
+
+def _environment() -> Dict[str, Any]:
+    try:
+        import docx
+        docx_version = getattr(docx, '__version__', 'unknown')
+    except ImportError:
+        docx_version = None
+    from docx_converter import __version__
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'python_docx': docx_version,
+        'word2md': __version__,
+    }
+
+
+def _format_result(result: Dict[str, Any]) -> str:
+    if result.get('peak_rss_mb') is not None:
+        memory = f"{result['peak_rss_mb']:>8.1f} MB peak"
+    else:
+        memory = f"{result.get('peak_heap_mb') or 0:>8.1f} MB heap peak (tracemalloc)"
+    return (f"{result['name']:<12} {result['seconds']:>9.3f}s "
+            f"{result['paragraphs_per_s'] or 0:>12.0f} para/s "
+            f"{result['mb_per_s'] or 0:>8.2f} MB/s {memory}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""
+Scaling guard for pathological documents.
+
+Each case generates a document at size N and 4N, converts both and compares the
+times. A linear code path takes about 4x as long on the larger input, a
+quadratic one about 16x; any ratio above --max-ratio fails, and the script
+exits non-zero so super-linear regressions fail the build:
+
+    python -m benchmarks.stress
+    python -m benchmarks.stress --only long_paragraph --scale 0.5
+"""
+
+import argparse
+import gc
+import logging
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from docx import Document
+    from docx.oxml import OxmlElement, parse_xml
+    from docx.oxml.ns import nsdecls, qn
+except ImportError:
+    print("Error: Missing required library. Please run: pip install python-docx")
+    sys.exit(1)
+
+from .corpus import RT_HYPERLINK, make_png
+
+RT_IMAGE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/image'
+
+
+def build_long_paragraph(n: int, path: str) -> None:
+    """One paragraph with n runs of alternating formatting, every 10th run a hyperlink"""
+    doc = Document()
+    p = doc.add_paragraph()._p
+    for i in range(n):
+        run = _run(f"word{i} ", bold=i % 3 == 0, italic=i % 5 == 0)
+        if i % 10 == 9:
+            rel_id = doc.part.relate_to(
+                f"https://example.com/{i}", RT_HYPERLINK, is_external=True)
+            hyperlink = OxmlElement('w:hyperlink')
+            hyperlink.set(qn('r:id'), rel_id)
+            hyperlink.append(run)
+            p.append(hyperlink)
+        else:
+            p.append(run)
+    doc.save(path)
+
+
+def build_wide_table(n: int, path: str, cols: int = 50) -> None:
+    """Table of n rows x cols columns with gridSpan and vMerge cells"""
+    doc = Document()
+    rows = []
+    for r in range(n):
+        cells = []
+        c = 0
+        while c < cols:
+            if r % 4 == 1 and c % 10 == 0 and c + 2 <= cols:
+                # Horizontally merged cell spanning two grid columns
+                cells.append(_cell(f"span {r}.{c}", '<w:gridSpan w:val="2"/>'))
+                c += 2
+                continue
+            if c == cols - 1 and r % 3 != 2:
+                # Vertical merges of two rows in the last column
+                v_merge = '<w:vMerge w:val="restart"/>' if r % 3 == 0 else '<w:vMerge/>'
+                cells.append(_cell(f"v {r}", v_merge))
+            else:
+                cells.append(_cell(f"r{r}c{c}"))
+            c += 1
+        rows.append(f"<w:tr>{''.join(cells)}</w:tr>")
+
+    grid = ''.join('<w:gridCol w:w="200"/>' for _ in range(cols))
+    tbl = parse_xml(f"<w:tbl {nsdecls('w')}><w:tblPr/><w:tblGrid>{grid}</w:tblGrid>"
+                    f"{''.join(rows)}</w:tbl>")
+    doc.element.body.insert(0, tbl)
+    doc.save(path)
+
+
+def build_many_images(n: int, path: str) -> None:
+    """n paragraphs each holding a distinct inline image"""
+    doc = Document()
+    body = doc.element.body
+    for i in range(n):
+        body.append(parse_xml(
+            f"<w:p {nsdecls('w', 'wp', 'a', 'pic', 'r')}><w:r><w:drawing><wp:inline>"
+            f"<wp:extent cx=\"9525\" cy=\"9525\"/><wp:docPr id=\"{i + 1}\" name=\"img{i}\"/>"
+            f"<a:graphic><a:graphicData uri=\"http://schemas.openxmlformats.org/drawingml/2006/picture\">"
+            f"<pic:pic><pic:nvPicPr><pic:cNvPr id=\"{i + 1}\" name=\"img{i}\"/><pic:cNvPicPr/></pic:nvPicPr>"
+            f"<pic:blipFill><a:blip r:embed=\"rIdStress{i}\"/></pic:blipFill><pic:spPr/></pic:pic>"
+            f"</a:graphicData></a:graphic></wp:inline></w:drawing></w:r></w:p>"))
+    doc.save(path)
+
+    # python-docx deduplicates image parts with a linear scan per image, so
+    # media and relationships are added to the saved package directly
+    _add_images_to_package(path, n)
+
+
+def build_deep_lists(n: int, path: str, depth: int = 50) -> None:
+    """n list items cycling through depth nesting levels"""
+    doc = Document()
+    body = doc.element.body
+    for i in range(n):
+        level = i % depth
+        body.append(parse_xml(
+            f"<w:p {nsdecls('w')}><w:pPr><w:numPr><w:ilvl w:val=\"{level}\"/>"
+            f"<w:numId w:val=\"1\"/></w:numPr></w:pPr>"
+            f"<w:r><w:t>item {i} at level {level}</w:t></w:r></w:p>"))
+    doc.save(path)
+
+
+# Case name -> (builder, N); the larger run uses 4N
+CASES: Dict[str, Any] = {
+    'long_paragraph': (build_long_paragraph, 25000),
+    'wide_table': (build_wide_table, 1250),
+    'many_images': (build_many_images, 2500),
+    'deep_lists': (build_deep_lists, 2500),
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Main function"""
+    parser = argparse.ArgumentParser(
+        description='Fail when conversion time grows super-linearly with input size')
+    parser.add_argument('--only', nargs='+', choices=sorted(CASES), metavar='CASE',
+                        help=f"Cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Multiply every base size N by this factor (default: 1.0)')
+    parser.add_argument('--max-ratio', type=float, default=6.0,
+                        help='Largest accepted time(4N) / time(N) (default: 6.0, linear is 4)')
+    parser.add_argument('--repeat', type=int, default=2, metavar='N',
+                        help='Conversions per size, the fastest is used (default: 2)')
+    parser.add_argument('--engine', choices=['dom', 'iterparse'], default='dom')
+    args = parser.parse_args(argv)
+
+    # Per-image/per-file INFO logging would dominate the timings
+    logging.basicConfig(level=logging.WARNING)
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix='word2md_stress_') as work_dir:
+        for name in args.only or list(CASES):
+            builder, base_size = CASES[name]
+            n = max(int(base_size * args.scale), 1)
+            small = _measure(builder, n, work_dir, args.engine, args.repeat)
+            large = _measure(builder, 4 * n, work_dir, args.engine, args.repeat)
+            ratio = large / small if small else float('inf')
+
+            status = 'ok' if ratio <= args.max_ratio else 'FAIL'
+            print(f"{name:<16} N={n:<7} {small:>8.3f}s  4N={4 * n:<7} {large:>8.3f}s  "
+                  f"ratio {ratio:>5.2f}  {status}")
+            if status != 'ok':
+                failures.append(name)
+
+    if failures:
+        print(f"Super-linear scaling in: {', '.join(failures)}")
+        sys.exit(1)
+
+
+def _measure(builder: Callable[[int, str], None], n: int, work_dir: str,
+             engine: str, repeat: int) -> float:
+    """Generate the case at size n and return its fastest conversion time"""
+    from docx_converter import DocxToMarkdownConverter
+
+    path = os.path.join(work_dir, f"{builder.__name__}_{n}.docx")
+    builder(n, path)
+
+    best = None
+    for attempt in range(max(repeat, 1)):
+        output_dir = os.path.join(
+            work_dir, f"out_{builder.__name__}_{n}_{attempt}")
+        converter = DocxToMarkdownConverter(engine=engine)
+        gc.collect()
+        start = time.perf_counter()
+        converter.convert_file(path, os.path.join(output_dir, 'out.md'),
+                               return_content=False)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def _run(text: str, bold: bool = False, italic: bool = False) -> Any:
+    run = OxmlElement('w:r')
+    if bold or italic:
+        rPr = OxmlElement('w:rPr')
+        if bold:
+            rPr.append(OxmlElement('w:b'))
+        if italic:
+            rPr.append(OxmlElement('w:i'))
+        run.append(rPr)
+    text_element = OxmlElement('w:t')
+    text_element.text = text
+    text_element.set(qn('xml:space'), 'preserve')
+    run.append(text_element)
+    return run
+
+
+def _cell(text: str, tc_pr: str = '') -> str:
+    return (f"<w:tc><w:tcPr><w:tcW w:w=\"200\" w:type=\"dxa\"/>{tc_pr}</w:tcPr>"
+            f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:tc>")
+
+
+def _add_images_to_package(path: str, n: int) -> None:
+    """Add n distinct PNG media parts related as rIdStress0..n-1 to a saved document"""
+    import random
+
+    rng = random.Random(0)
+    temp_path = f"{path}.tmp"
+    with zipfile.ZipFile(path) as source, \
+            zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            data = source.read(item.filename)
+            if item.filename == 'word/_rels/document.xml.rels':
+                rels = ''.join(
+                    f'<Relationship Id="rIdStress{i}" Type="{RT_IMAGE}" '
+                    f'Target="media/stress{i}.png"/>' for i in range(n))
+                data = data.replace(b'</Relationships>',
+                                    rels.encode('utf-8') + b'</Relationships>')
+            elif item.filename == '[Content_Types].xml' and b'Extension="png"' not in data:
+                data = data.replace(
+                    b'<Default ', b'<Default Extension="png" ContentType="image/png"/><Default ', 1)
+            target.writestr(item, data)
+        for i in range(n):
+            target.writestr(f"word/media/stress{i}.png", make_png(2, rng))
+    os.replace(temp_path, path)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,8 +8,9 @@ Supports conversion of text, headings, lists, tables, links and other basic form
 
 from .cli import main
 from .converter import DocxToMarkdownConverter
+from .result import ConversionResult
 
 __version__ = "1.0.2"
 __author__ = "hnrobert"
 
-__all__ = ['DocxToMarkdownConverter', 'main']
+__all__ = ['ConversionResult', 'DocxToMarkdownConverter', 'main']
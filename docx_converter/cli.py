@@ -3,13 +3,24 @@ Command line interface for DOCX to Markdown converter.
 """
 
 import argparse
+import json
 import logging
+import multiprocessing
 import os
+import shutil
 import sys
+import tempfile
 from glob import glob
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 from .converter import DocxToMarkdownConverter
+from .doc_cache import DocConversionCache
+from .heading_matcher import load_heading_keywords
+from .libreoffice import convert_docs_to_docx_batch
+from .manifest import ConversionManifest, make_fingerprint
+from .markdown_writer import STAGE_NAMES
+from .profiling import merge_stats
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +36,7 @@ Example usage:
   %(prog)s input.docx -o output.md       # Output to file
     %(prog)s input.doc                     # Legacy .doc (requires LibreOffice)
   %(prog)s *.docx -o output_dir/         # Batch conversion
+  %(prog)s *.docx -o output_dir/ -j 8    # Batch conversion with 8 workers
         """
     )
 
@@ -45,51 +57,211 @@ Example usage:
         help='Show verbose output'
     )
 
+    parser.add_argument(
+        '--lazy-images',
+        action='store_true',
+        help='Only extract images that are referenced in the Markdown output'
+    )
+
+    parser.add_argument(
+        '--hash-image-names',
+        action='store_true',
+        help='Name images by content hash and write identical images only once'
+    )
+
+    parser.add_argument(
+        '--shared-assets',
+        metavar='DIR',
+        help='Store unique images for all converted files in DIR (implies --hash-image-names)'
+    )
+
+    parser.add_argument(
+        '--shared-assets-mode',
+        choices=['hardlink', 'relative'],
+        default='hardlink',
+        help='Hardlink shared images into each assets/ folder, or reference DIR by relative path (default: hardlink)'
+    )
+
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Convert files in parallel using N worker processes (default: 1)'
+    )
+
+    parser.add_argument(
+        '--max-tasks-per-child',
+        type=int,
+        default=100,
+        metavar='N',
+        help='Recycle each worker process after N files to bound memory growth (default: 100, 0 = never)'
+    )
+
+    parser.add_argument(
+        '--doc-chunk-size',
+        type=int,
+        default=20,
+        metavar='N',
+        help='Convert legacy .doc inputs with one LibreOffice run per N files (default: 20)'
+    )
+
+    parser.add_argument(
+        '--doc-cache',
+        metavar='DIR',
+        help='Cache .doc to .docx conversions in DIR, keyed by file content and LibreOffice version'
+    )
+
+    parser.add_argument(
+        '--doc-cache-size',
+        type=int,
+        default=1024,
+        metavar='MB',
+        help='Maximum size of the .doc conversion cache, least recently used entries are evicted (default: 1024)'
+    )
+
+    parser.add_argument(
+        '--engine',
+        choices=DocxToMarkdownConverter.ENGINES,
+        default='dom',
+        help="Conversion engine: 'dom' loads the whole document, 'iterparse' streams "
+             "word/document.xml block by block for very large documents (default: dom)"
+    )
+
+    parser.add_argument(
+        '--lazy-package',
+        action='store_true',
+        help='Parse only the XML parts the converter needs and stream images from the '
+             'package instead of loading every part (media included) into memory'
+    )
+
+    parser.add_argument(
+        '--heading-keywords',
+        metavar='FILE',
+        help='JSON file with the keyword sets of the heading heuristics for paragraphs not '
+             'styled as headings ("section_keywords", "heading_keywords", "heading_starters")'
+    )
+
+    parser.add_argument(
+        '--skip-cleanup',
+        action='append',
+        choices=STAGE_NAMES,
+        default=[],
+        metavar='STAGE',
+        help=f"Turn off a Markdown cleanup stage, repeatable ({', '.join(STAGE_NAMES)})"
+    )
+
+    parser.add_argument(
+        '--text-only',
+        action='store_true',
+        help='Fast conversion for search indexing: keep headings, lists and tables but '
+             'skip images (no assets/ folder), hyperlinks, inline formatting and the '
+             'bold/font-size heading heuristics'
+    )
+
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only convert inputs that changed since the last run into the output directory, '
+             'and remove outputs of inputs that no longer exist (requires -o DIR)'
+    )
+
+    parser.add_argument(
+        '--profile-report',
+        metavar='FILE',
+        help='Write per-file stage timings (wall/CPU) and counters as JSON to FILE'
+    )
+
     args = parser.parse_args()
 
+    if args.incremental and not (args.output and (os.path.isdir(args.output)
+                                                  or args.output.endswith('/'))):
+        parser.error('--incremental requires -o to be an output directory')
+
+    heading_keywords = None
+    if args.heading_keywords:
+        try:
+            heading_keywords = load_heading_keywords(args.heading_keywords)
+        except (OSError, ValueError) as e:
+            parser.error(f"--heading-keywords: {e}")
+
     # Set logging level
-    if args.verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
-    else:
-        logging.basicConfig(level=logging.INFO,
-                            format='%(asctime)s - %(levelname)s - %(message)s')
+    _configure_logging(args.verbose)
+
+    converter_options = {
+        'lazy_images': args.lazy_images,
+        'hash_image_names': args.hash_image_names,
+        'shared_assets_dir': args.shared_assets,
+        'shared_assets_mode': args.shared_assets_mode,
+        'doc_cache_dir': args.doc_cache,
+        'doc_cache_size': args.doc_cache_size * 1024 * 1024,
+        'engine': args.engine,
+        'lazy_package': args.lazy_package,
+        'heading_keywords': heading_keywords,
+        'skip_cleanup': args.skip_cleanup,
+        'text_only': args.text_only,
+    }
 
-    converter = DocxToMarkdownConverter()
+    doc_work_dir: Optional[str] = None
+    manifest: Optional[ConversionManifest] = None
+    # Stats of every converted file, for --profile-report
+    reports: List[Dict[str, Any]] = []
 
     try:
-        for input_file in args.input_files:
-            # Handle wildcards
-            matching_files = glob(input_file)
+        tasks = _collect_tasks(args.input_files, args.output)
+        jobs = args.jobs
 
-            if not matching_files:
-                logger.warning(f"No matching files found: {input_file}")
-                continue
+        # Workers must not write the same output file concurrently (-o FILE with
+        # several inputs, or inputs with the same name in different folders)
+        output_paths = [task[1] for task in tasks if task[1]]
+        if jobs > 1 and len(set(output_paths)) < len(output_paths):
+            logger.warning("Several inputs share an output file, converting sequentially")
+            jobs = 1
+
+        if args.incremental:
+            manifest = _open_manifest(args.output, converter_options)
+            manifest.remove_vanished(task[0] for task in tasks)
+            tasks = _outdated_tasks(tasks, manifest)
+
+        # Convert legacy .doc inputs up front in batched LibreOffice runs
+        doc_paths = [task[0] for task in tasks
+                     if task[0].lower().endswith('.doc')]
+        if len(doc_paths) > 1 and args.doc_chunk_size > 1:
+            doc_work_dir = tempfile.mkdtemp(prefix='word2md_batch_')
+            doc_cache = DocConversionCache(
+                args.doc_cache, converter_options['doc_cache_size']) if args.doc_cache else None
+            tasks = _preconvert_doc_files(
+                tasks, doc_paths, doc_work_dir, args.doc_chunk_size, jobs, doc_cache)
 
-            for file_path in matching_files:
-                if not file_path.lower().endswith(('.docx', '.doc')):
-                    logger.warning(f"Skipping non-Word file: {file_path}")
-                    continue
-
-                # Determine output path
-                output_path = None
-                if args.output:
-                    if os.path.isdir(args.output) or args.output.endswith('/'):
-                        # Output to directory
-                        base_name = Path(file_path).stem
-                        output_path = os.path.join(
-                            args.output, f"{base_name}.md")
-                    else:
-                        # Output to specified file
-                        output_path = args.output
-
-                # Execute conversion
+        if jobs > 1 and len(tasks) > 1:
+            failed = _run_parallel(tasks, converter_options, jobs, args.max_tasks_per_child,
+                                   manifest, reports, args.verbose)
+            if args.profile_report:
+                _write_profile_report(args.profile_report, reports)
+            if failed:
+                logger.error(
+                    f"{len(failed)} of {len(tasks)} files failed to convert")
+                sys.exit(1)
+        else:
+            converter = DocxToMarkdownConverter(**converter_options)
+            for file_path, output_path, converted_docx_path in tasks:
+                # Execute conversion (content is only kept when it goes to stdout)
                 markdown_content = converter.convert_file(
-                    file_path, output_path)
+                    file_path, output_path, converted_docx_path,
+                    return_content=not output_path)
+
+                if manifest:
+                    manifest.record(file_path, output_path,
+                                    converter.asset_paths())
+                reports.append(
+                    {'input': file_path, **converter.stats.to_dict()})
 
                 # If no output file specified, print to stdout
                 if not output_path:
-                    print(f"\n=== {file_path} ===\n")
-                    print(markdown_content)
+                    _print_markdown(file_path, markdown_content)
+
+            if args.profile_report:
+                _write_profile_report(args.profile_report, reports)
 
     except KeyboardInterrupt:
         logger.info("Conversion interrupted by user")
@@ -97,6 +269,211 @@ Example usage:
     except Exception as e:
         logger.error(f"Program execution failed: {str(e)}")
         sys.exit(1)
+    finally:
+        # Conversions recorded since the last save, also when interrupted
+        if manifest:
+            try:
+                manifest.flush()
+            except OSError as e:
+                logger.error(f"Could not write conversion manifest: {e}")
+        if doc_work_dir:
+            shutil.rmtree(doc_work_dir, ignore_errors=True)
+
+
+# (input path, output path, pre-converted .docx path for legacy .doc inputs)
+Task = Tuple[str, Optional[str], Optional[str]]
+
+
+def _collect_tasks(input_files: List[str], output: Optional[str]) -> List[Task]:
+    """Expand wildcards and determine the output path of every input file"""
+    tasks = []
+    for input_file in input_files:
+        # Handle wildcards
+        matching_files = glob(input_file)
+
+        if not matching_files:
+            logger.warning(f"No matching files found: {input_file}")
+            continue
+
+        for file_path in matching_files:
+            if not file_path.lower().endswith(('.docx', '.doc')):
+                logger.warning(f"Skipping non-Word file: {file_path}")
+                continue
+
+            # Determine output path
+            output_path = None
+            if output:
+                if os.path.isdir(output) or output.endswith('/'):
+                    # Output to directory
+                    base_name = Path(file_path).stem
+                    output_path = os.path.join(output, f"{base_name}.md")
+                else:
+                    # Output to specified file
+                    output_path = output
+
+            tasks.append((file_path, output_path, None))
+    return tasks
+
+
+def _preconvert_doc_files(tasks: List[Task], doc_paths: List[str], work_dir: str,
+                          chunk_size: int, jobs: int,
+                          doc_cache: Optional[DocConversionCache] = None) -> List[Task]:
+    """
+    Convert .doc inputs in chunks, one soffice invocation per chunk
+
+    Every task converts from a .docx in work_dir for the whole run; the cache only
+    supplies and receives copies, so evictions during the batch can't remove a
+    file that is still to be converted.
+    """
+    converted: Dict[str, str] = {}
+    try:
+        # Conversions found in the cache skip LibreOffice entirely
+        cache_keys: Dict[str, str] = {}
+        if doc_cache:
+            cached_dir = os.path.join(work_dir, 'cached')
+            os.makedirs(cached_dir, exist_ok=True)
+            for doc_path in doc_paths:
+                cache_keys[doc_path] = doc_cache.key_for(doc_path)
+                cached_docx_path = doc_cache.get(
+                    cache_keys[doc_path],
+                    copy_to=os.path.join(cached_dir, f"{cache_keys[doc_path]}.docx"))
+                if cached_docx_path:
+                    converted[doc_path] = cached_docx_path
+
+        missing = [p for p in doc_paths if p not in converted]
+        if missing:
+            batch_converted = convert_docs_to_docx_batch(
+                missing, work_dir, chunk_size=chunk_size, jobs=jobs)
+            for doc_path, docx_path in batch_converted.items():
+                if doc_cache:
+                    try:
+                        doc_cache.put(cache_keys[doc_path], docx_path)
+                    except OSError as e:
+                        logger.warning(
+                            f"Could not write doc conversion cache: {e}")
+                converted[doc_path] = docx_path
+    except RuntimeError as e:
+        # Fall back to converting each .doc on its own
+        logger.warning(f"Batch .doc conversion failed: {e}")
+        return tasks
+
+    return [(file_path, output_path, converted.get(file_path))
+            for file_path, output_path, _ in tasks]
+
+
+def _open_manifest(output_root: str, converter_options: Dict[str, Any]) -> ConversionManifest:
+    """Open the incremental conversion manifest of an output directory"""
+    from . import __version__
+
+    # Cache settings don't change the output
+    options = {key: value for key, value in converter_options.items()
+               if not key.startswith('doc_cache')}
+    return ConversionManifest(output_root, make_fingerprint(__version__, options))
+
+
+def _outdated_tasks(tasks: List[Task], manifest: ConversionManifest) -> List[Task]:
+    """Drop tasks whose input is unchanged since it was last converted"""
+    outdated = []
+    for task in tasks:
+        file_path, output_path, _ = task
+        if manifest.is_up_to_date(file_path, output_path):
+            logger.info(f"Skipping unchanged file: {file_path}")
+        else:
+            outdated.append(task)
+    return outdated
+
+
+def _write_profile_report(report_path: str, reports: List[Dict[str, Any]]) -> None:
+    """Write per-file stats and their totals as JSON"""
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump({'files': reports, 'totals': merge_stats(reports)}, f, indent=2)
+    logger.info(f"Profile report written to: {report_path}")
+
+
+def _print_markdown(file_path: str, markdown_content: str) -> None:
+    """Print converted Markdown to stdout"""
+    print(f"\n=== {file_path} ===\n")
+    print(markdown_content)
+
+
+def _configure_logging(verbose: bool) -> None:
+    """Set up logging of the CLI process or of a worker process"""
+    logging.basicConfig(level=logging.DEBUG if verbose else logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+# Converter owned by each worker process of the pool
+_worker_converter: Optional[DocxToMarkdownConverter] = None
+
+
+def _init_worker(converter_options: Dict[str, Any], verbose: bool = False) -> None:
+    """
+    Set up a worker process and create its converter once
+
+    Spawned workers don't inherit the CLI's logging setup, so it is repeated
+    here. python-docx is imported with this module.
+    """
+    global _worker_converter
+    _configure_logging(verbose)
+    _worker_converter = DocxToMarkdownConverter(**converter_options)
+
+
+def _convert_in_worker(task: Task) -> Tuple[Optional[str], List[str], Dict[str, Any], Optional[str]]:
+    """
+    Convert one file inside a worker process
+
+    Returns:
+        (Markdown content if it goes to stdout, written image paths, stats,
+        error message or None)
+    """
+    file_path, output_path, converted_docx_path = task
+    try:
+        # Only keep content when it has to be printed
+        markdown_content = _worker_converter.convert_file(
+            file_path, output_path, converted_docx_path,
+            return_content=not output_path)
+    except Exception as e:
+        # Isolate per-file errors so one bad file doesn't abort the batch
+        return None, [], {}, f"{type(e).__name__}: {e}"
+
+    return (markdown_content, _worker_converter.asset_paths(),
+            _worker_converter.stats.to_dict(), None)
+
+
+def _run_parallel(tasks: List[Task], converter_options: Dict[str, Any],
+                  jobs: int, max_tasks_per_child: Optional[int],
+                  manifest: Optional[ConversionManifest] = None,
+                  reports: Optional[List[Dict[str, Any]]] = None,
+                  verbose: bool = False) -> List[str]:
+    """
+    Convert files in a pool of worker processes
+
+    Results are consumed in input order, so stdout output is deterministic.
+    Successful conversions are recorded in the manifest as they complete and
+    their stats are appended to reports.
+
+    Returns:
+        List of input files that failed to convert
+    """
+    failed = []
+    with multiprocessing.Pool(processes=jobs,
+                              initializer=_init_worker,
+                              initargs=(converter_options, verbose),
+                              maxtasksperchild=max_tasks_per_child or None) as pool:
+        results = pool.imap(_convert_in_worker, tasks, chunksize=1)
+        for (file_path, output_path, _), (markdown_content, asset_paths, stats, error) in zip(tasks, results):
+            if error:
+                logger.error(f"Failed to convert {file_path}: {error}")
+                failed.append(file_path)
+                continue
+
+            if manifest:
+                manifest.record(file_path, output_path, asset_paths)
+            if reports is not None:
+                reports.append({'input': file_path, **stats})
+            if not output_path:
+                _print_markdown(file_path, markdown_content)
+    return failed
 
 
 if __name__ == '__main__':
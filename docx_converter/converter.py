@@ -3,17 +3,24 @@
 Core converter module for DOCX to Markdown conversion.
 """
 
+import io
 import logging
 import os
 import shutil
-import subprocess
 import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple
 
+from .doc_cache import DocConversionCache
 from .document_processor import DocumentProcessor
+from .heading_matcher import KEYWORD_SETS, HeadingMatcher
 from .image_extractor import ImageExtractor
-from .utils import clean_markdown_content
+from .iterparse_engine import convert_package_streaming
+from .libreoffice import convert_doc_to_docx
+from .markdown_writer import MarkdownWriter, create_stages
+from .package import PackageDocument, ZipPackage
+from .profiling import ConversionStats
+from .result import ConversionResult, capture_warnings
 
 try:
     from docx import Document
@@ -28,26 +35,90 @@ logger = logging.getLogger(__name__)
 class DocxToMarkdownConverter:
     """DOCX to Markdown converter class"""
 
-    def __init__(self):
-        self.output_lines = []
+    ENGINES = ('dom', 'iterparse')
+
+    def __init__(self, lazy_images: bool = False, hash_image_names: bool = False,
+                 shared_assets_dir: Optional[str] = None, shared_assets_mode: str = 'hardlink',
+                 doc_cache_dir: Optional[str] = None, doc_cache_size: int = 1024 * 1024 * 1024,
+                 engine: str = 'dom', lazy_package: bool = False,
+                 heading_keywords: Optional[Dict[str, List[str]]] = None,
+                 skip_cleanup: Optional[List[str]] = None, text_only: bool = False):
+        """
+        Args:
+            lazy_images: Only write images to assets/ once the Markdown references them
+            hash_image_names: Name images by content hash, writing each unique image once
+            shared_assets_dir: Directory holding unique images for a whole batch
+                (implies hash_image_names)
+            shared_assets_mode: 'hardlink' shared images into each assets/ directory,
+                or reference them by 'relative' path
+            doc_cache_dir: Directory of a persistent .doc -> .docx conversion cache
+            doc_cache_size: Maximum size of the conversion cache in bytes
+            engine: 'dom' loads the document through python-docx, 'iterparse' streams
+                word/document.xml block by block with bounded memory
+            lazy_package: With the 'dom' engine, parse only the XML parts the converter
+                uses instead of loading the whole package (media included) into memory
+            heading_keywords: Keyword sets of the heading heuristics for paragraphs not
+                styled as headings ('section_keywords', 'heading_keywords',
+                'heading_starters'); missing sets keep the defaults
+            skip_cleanup: Names of Markdown cleanup stages to turn off
+                ('merge_tags', 'heading_levels', 'heading_punctuation',
+                'collapse_blank_lines')
+            text_only: Only convert text, headings, lists and tables: images are
+                neither extracted nor referenced, no assets/ directory is created,
+                and paragraphs are written without inline formatting or links.
+                Run formatting is not resolved, so only styled headings and
+                numbered section titles become headings. With the 'dom' engine
+                the package is opened lazily (media is never read).
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown conversion engine: {engine}")
+
+        self.engine = engine
+        self.lazy_package = lazy_package
+        self.text_only = text_only
+        unknown = set(heading_keywords or {}) - set(KEYWORD_SETS)
+        if unknown:
+            raise ValueError(f"Unknown heading keyword sets: {', '.join(sorted(unknown))}")
+        # Compiled once, shared by every document this converter converts
+        self.heading_matcher = HeadingMatcher(**(heading_keywords or {}))
+        self.skip_cleanup = list(skip_cleanup or [])
+        create_stages(self.skip_cleanup)  # Reject unknown stage names early
+        self.lazy_images = lazy_images
+        self.hash_image_names = hash_image_names
+        self.shared_assets_dir = shared_assets_dir
+        self.shared_assets_mode = shared_assets_mode
+        self.doc_cache = DocConversionCache(
+            doc_cache_dir, doc_cache_size) if doc_cache_dir else None
+        self.output_lines: Optional[MarkdownWriter] = None
+        # Timing and counters of the last conversion
+        self.stats = ConversionStats()
         self.output_folder = None
         self.assets_dir = None
         self.document_processor = None
         self.image_extractor = None
 
-    def convert_file(self, input_path: str, output_path: Optional[str] = None) -> str:
+    def convert_file(self, input_path: str, output_path: Optional[str] = None,
+                     converted_docx_path: Optional[str] = None,
+                     return_content: bool = True) -> Optional[str]:
         """
         Convert DOCX file to Markdown format
 
         Args:
             input_path: Input DOCX file path
             output_path: Output Markdown file path (optional)
+            converted_docx_path: Already converted .docx for a legacy .doc input,
+                e.g. from a batch LibreOffice run (optional, not deleted)
+            return_content: Keep the Markdown in memory and return it. When False the
+                Markdown is only streamed to the output file and None is returned.
 
         Returns:
             Markdown content string
         """
         temp_dir: Optional[str] = None
         temp_docx_path: Optional[str] = None
+        partial_output_path: Optional[str] = None
+        package: Optional[ZipPackage] = None
+        self.stats = ConversionStats()
 
         try:
             # Check if input file exists
@@ -60,45 +131,67 @@ class DocxToMarkdownConverter:
 
             # Convert legacy .doc to a temporary .docx (python-docx can't open .doc)
             effective_input_path = input_path
-            if input_path.lower().endswith('.doc'):
-                temp_dir = tempfile.mkdtemp(prefix='word2md_', suffix='_docx')
-                temp_docx_path = self._convert_doc_to_docx(
-                    input_path, temp_dir)
-                effective_input_path = temp_docx_path
+            if input_path.lower().endswith('.doc') and converted_docx_path:
+                effective_input_path = converted_docx_path
+            elif input_path.lower().endswith('.doc'):
+                # Timed as its own stage, LibreOffice dominates when it runs
+                with self.stats.stage('doc_conversion'):
+                    temp_dir = tempfile.mkdtemp(
+                        prefix='word2md_', suffix='_docx')
+                    cache_key = self.doc_cache.key_for(
+                        input_path) if self.doc_cache else None
+                    # Converted from a private copy, other processes may evict the entry
+                    cached_docx_path = self.doc_cache.get(
+                        cache_key, copy_to=os.path.join(
+                            temp_dir, f"{Path(input_path).stem}.docx")) if cache_key else None
+
+                    if cached_docx_path:
+                        effective_input_path = cached_docx_path
+                    else:
+                        temp_docx_path = self._convert_doc_to_docx(
+                            input_path, temp_dir)
+                        effective_input_path = temp_docx_path
+                        if cache_key:
+                            self._store_in_doc_cache(cache_key, temp_docx_path)
 
             # Load DOCX document
             logger.info(f"Loading document: {effective_input_path}")
-            doc = Document(effective_input_path)
-
-            # Reset output
-            self.output_lines = []
+            with self.stats.stage('load'):
+                doc, package = self._load_document(effective_input_path)
 
             # Initialize processors
             if self.assets_dir:
-                self.image_extractor = ImageExtractor(self.assets_dir)
+                self.image_extractor = ImageExtractor(
+                    self.assets_dir, lazy=self.lazy_images,
+                    hash_names=self.hash_image_names,
+                    shared_assets_dir=self.shared_assets_dir,
+                    shared_assets_mode=self.shared_assets_mode)
             else:
                 # Fallback if assets_dir is None
                 self.image_extractor = ImageExtractor("")
 
-            self.document_processor = DocumentProcessor(
-                self.image_extractor,
-                self.output_lines
-            )
-
-            # Extract images first
+            # Extract images first (text-only conversions have no assets_dir)
             if self.image_extractor and self.assets_dir:
-                self.image_extractor.extract_images(effective_input_path)
+                with self.stats.stage('extract_images'):
+                    self._extract_images(doc, package)
 
-            # Convert document content
-            self.document_processor.convert_document(doc)
-
-            # Generate and clean Markdown content
-            markdown_content = clean_markdown_content(self.output_lines)
-
-            # Write to file
+            # Stream cleaned Markdown to a partial file, renamed once complete
             final_output_path = self._get_final_output_path(
                 input_path, output_path)
-            self._write_output(markdown_content, final_output_path)
+            partial_output_path = self._prepare_partial_output(
+                final_output_path)
+
+            with open(partial_output_path, 'w', encoding='utf-8') as output_stream:
+                self._render(doc, package, MarkdownWriter(
+                    output_stream, keep_content=return_content, stats=self.stats,
+                    stages=create_stages(self.skip_cleanup)))
+
+            os.replace(partial_output_path, final_output_path)
+            partial_output_path = None
+            self.stats.count('images', len(self.image_extractor.assets))
+            self.stats.count(
+                'bytes_written', os.path.getsize(final_output_path))
+            markdown_content = self.output_lines.getvalue() if return_content else None
 
             # Clean up empty assets directory
             self._cleanup_empty_assets_dir()
@@ -112,7 +205,15 @@ class DocxToMarkdownConverter:
             logger.error(f"Error occurred during conversion: {str(e)}")
             raise
         finally:
+            if package is not None:
+                package.close()
+
             # Clean up temporary conversion artifacts
+            if partial_output_path:
+                try:
+                    os.remove(partial_output_path)
+                except OSError:
+                    pass
             if temp_docx_path:
                 try:
                     os.remove(temp_docx_path)
@@ -124,138 +225,134 @@ class DocxToMarkdownConverter:
                 except OSError:
                     pass
 
+    def convert_bytes(self, data: bytes) -> ConversionResult:
+        """
+        Convert an in-memory DOCX without touching the filesystem
+
+        Args:
+            data: Content of a .docx file
+
+        Returns:
+            ConversionResult with the Markdown, lazy image providers and warnings
+        """
+        return self.convert_stream(io.BytesIO(data))
+
+    def convert_stream(self, stream: IO[bytes]) -> ConversionResult:
+        """
+        Convert a DOCX read from a binary file-like object without touching the filesystem
+
+        Legacy .doc content is not supported here since it needs LibreOffice. With
+        the lazy loader or the iterparse engine images are read from the stream on
+        demand, so keep it open until the result is closed.
+
+        Args:
+            stream: Seekable binary stream of a .docx file
+
+        Returns:
+            ConversionResult with the Markdown, lazy image providers and warnings
+        """
+        package: Optional[ZipPackage] = None
+        self.stats = ConversionStats()
+        self.output_folder = None
+        self.assets_dir = None
+
+        try:
+            with capture_warnings() as warnings:
+                with self.stats.stage('load'):
+                    doc, package = self._load_document(stream)
+
+                # Images stay in the package and are only named here
+                self.image_extractor = ImageExtractor(
+                    None, lazy=self.lazy_images, hash_names=self.hash_image_names,
+                    in_memory=True)
+                if not self.text_only:
+                    with self.stats.stage('extract_images'):
+                        self._extract_images(doc, package)
+
+                writer = MarkdownWriter(
+                    stats=self.stats, stages=create_stages(self.skip_cleanup))
+                self._render(doc, package, writer)
+
+            markdown = writer.getvalue()
+            self.stats.count('images', len(self.image_extractor.assets))
+            self.stats.count('bytes_written', len(markdown.encode('utf-8')))
+
+            assets = {name: _blob_provider(part)
+                      for name, part in self.image_extractor.assets.items()}
+            return ConversionResult(markdown, assets, warnings, package, self.stats)
+
+        except Exception as e:
+            logger.error(f"Error occurred during conversion: {str(e)}")
+            if package is not None:
+                package.close()
+            raise
+
+    def asset_paths(self) -> List[str]:
+        """Paths of the image files written to assets/ by the last convert_file call"""
+        if not self.assets_dir or not self.image_extractor:
+            return []
+        if self.shared_assets_dir and self.shared_assets_mode == 'relative':
+            # Images are referenced in the shared store, nothing is in assets/
+            return []
+        return [os.path.join(self.assets_dir, name)
+                for name in self.image_extractor.assets]
+
+    def _load_document(self, source: Any) -> Tuple[Any, Optional[ZipPackage]]:
+        """
+        Load a DOCX from a path or binary stream
+
+        The streaming engine and the lazy loader only open the package; media parts
+        are then streamed from the zip. Text-only conversions always use the lazy
+        loader since they never read media.
+
+        Returns:
+            Tuple of the document (None for the streaming engine) and the opened
+            package (None when python-docx loaded the whole document)
+        """
+        if self.engine == 'iterparse' or self.lazy_package or self.text_only:
+            package = ZipPackage(source)
+            doc = PackageDocument(package) if self.engine == 'dom' else None
+            return doc, package
+        return Document(source), None
+
+    def _extract_images(self, doc: Any, package: Optional[ZipPackage]) -> None:
+        """Map the document's image relationships with the current image extractor"""
+        if package is not None:
+            self.image_extractor.extract_images_from_package(
+                package, package.main_document_member())
+        else:
+            self.image_extractor.extract_images(doc.part)
+
+    def _render(self, doc: Any, package: Optional[ZipPackage], writer: MarkdownWriter) -> None:
+        """Convert the document content into writer and finish it"""
+        self.output_lines = writer
+        self.document_processor = DocumentProcessor(
+            self.image_extractor,
+            self.output_lines,
+            self.stats,
+            self.heading_matcher,
+            self.text_only
+        )
+
+        if self.engine == 'iterparse':
+            convert_package_streaming(package, self.document_processor)
+        else:
+            self.document_processor.convert_document(doc)
+        self.output_lines.close()
+
     def _convert_doc_to_docx(self, input_doc_path: str, out_dir: str) -> str:
         """Convert a legacy .doc file to .docx using LibreOffice/soffice.
 
         Returns the converted .docx path.
         """
-        soffice_path = self._find_soffice_executable()
-
-        # LibreOffice writes the output docx into out_dir, keeping the base name.
-        cmd = [
-            soffice_path,
-            '--headless',
-            '--nologo',
-            '--nofirststartwizard',
-            '--convert-to',
-            'docx',
-            '--outdir',
-            out_dir,
-            input_doc_path,
-        ]
-
-        logger.info(
-            f"Converting .doc to .docx via LibreOffice: {input_doc_path}")
+        return convert_doc_to_docx(input_doc_path, out_dir)
+
+    def _store_in_doc_cache(self, cache_key: str, docx_path: str) -> None:
+        """Remember a LibreOffice conversion result, ignoring cache write errors"""
         try:
-            subprocess.run(cmd, check=True, stdout=subprocess.PIPE,
-                           stderr=subprocess.PIPE)
-        except FileNotFoundError as e:
-            raise RuntimeError(
-                "LibreOffice (soffice) not found. Install LibreOffice to convert .doc files. "
-                "On macOS: brew install --cask libreoffice"
-            ) from e
-        except subprocess.CalledProcessError as e:
-            stderr = (e.stderr or b'').decode('utf-8', errors='replace')
-            raise RuntimeError(
-                f"Failed to convert .doc to .docx using LibreOffice. Details: {stderr.strip()}"
-            ) from e
-
-        expected = os.path.join(out_dir, f"{Path(input_doc_path).stem}.docx")
-        if os.path.exists(expected):
-            return expected
-
-        # Fallback: find any produced .docx
-        candidates = [p for p in Path(out_dir).glob('*.docx') if p.is_file()]
-        if len(candidates) == 1:
-            return str(candidates[0])
-        if candidates:
-            # If multiple, pick the newest
-            newest = max(candidates, key=lambda p: p.stat().st_mtime)
-            return str(newest)
-
-        raise RuntimeError(
-            "LibreOffice reported success but no .docx was produced.")
-
-    def _find_soffice_executable(self) -> str:
-        """Locate LibreOffice command for headless conversion across OSes.
-
-        Order of checks:
-        1. Environment variable `WORD2MD_SOFFICE_PATH`
-        2. Common executable names on PATH: `soffice`, `libreoffice`
-        3. Known installation paths per-platform (macOS, Windows, common Linux locations)
-        4. Flatpak/exported paths
-        Raises a RuntimeError with helpful instructions if not found.
-        """
-        import platform
-
-        # 1) Allow explicit override via environment variable
-        env_path = os.environ.get('DOCX2MD_SOFFICE_PATH') or os.environ.get(
-            'WORD2MD_SOFFICE_PATH') or os.environ.get('SOFFICE_PATH')
-        if env_path:
-            if os.path.exists(env_path) and os.access(env_path, os.X_OK):
-                return env_path
-            else:
-                raise RuntimeError(
-                    f"Environment variable set to '{env_path}' but file is not executable or doesn't exist. Set DOCX2MD_SOFFICE_PATH or WORD2MD_SOFFICE_PATH to a valid soffice path.")
-
-        # 2) Common executable names on PATH
-        for name in ('soffice', 'libreoffice'):
-            found = shutil.which(name)
-            if found:
-                return found
-
-        system = platform.system()
-
-        # 3) Platform-specific likely locations
-        candidates = []
-
-        if system == 'Darwin':  # macOS
-            candidates += [
-                '/Applications/LibreOffice.app/Contents/MacOS/soffice',
-                '/Applications/LibreOffice.app/Contents/MacOS/soffice.bin',
-                '/usr/local/bin/soffice',
-                '/opt/homebrew/bin/soffice',
-                '/opt/local/bin/soffice',
-            ]
-        elif system == 'Windows':  # Windows
-            program_files = os.environ.get('ProgramFiles', r'C:\Program Files')
-            program_files_x86 = os.environ.get(
-                'ProgramFiles(x86)', r'C:\Program Files (x86)')
-            candidates += [
-                os.path.join(program_files, 'LibreOffice',
-                             'program', 'soffice.exe'),
-                os.path.join(program_files_x86, 'LibreOffice',
-                             'program', 'soffice.exe'),
-            ]
-        else:  # Linux / other Unix
-            candidates += [
-                '/usr/bin/libreoffice',
-                '/usr/bin/soffice',
-                '/usr/local/bin/libreoffice',
-                '/usr/local/bin/soffice',
-                '/snap/bin/libreoffice',
-            ]
-
-        # 4) Check flatpak / exported locations
-        candidates += [
-            '/var/lib/flatpak/exports/bin/libreoffice',
-            '/var/lib/flatpak/exports/bin/soffice',
-        ]
-
-        # Verify candidate paths
-        for p in candidates:
-            if p and os.path.exists(p) and os.access(p, os.X_OK):
-                return p
-
-        # Nothing found — provide a helpful error message
-        hint_lines = [
-            'LibreOffice (soffice) not found on this system.',
-            'To enable .doc support the converter needs LibreOffice for .doc → .docx conversion.',
-            'Options:',
-            "  * Install LibreOffice and ensure `soffice` is on PATH (macOS: `brew install --cask libreoffice`).",
-            "  * Set the environment variable `WORD2MD_SOFFICE_PATH` to the soffice executable path.",
-        ]
-        raise RuntimeError('\n'.join(hint_lines))
+            self.doc_cache.put(cache_key, docx_path)
+        except OSError as e:
+            logger.warning(f"Could not write doc conversion cache: {e}")
 
     def _setup_output_structure(self, input_path: str, output_path: Optional[str]):
         """Setup output folder structure"""
@@ -273,6 +370,10 @@ class DocxToMarkdownConverter:
 
         # Create output folder and assets folder
         os.makedirs(self.output_folder, exist_ok=True)
+        if self.text_only:
+            # Nothing is ever written to assets/
+            self.assets_dir = None
+            return
         self.assets_dir = os.path.join(self.output_folder, "assets")
         os.makedirs(self.assets_dir, exist_ok=True)
 
@@ -292,14 +393,13 @@ class DocxToMarkdownConverter:
 
         return f"{input_stem}.md"
 
-    def _write_output(self, content: str, output_path: str):
-        """Write output file"""
+    def _prepare_partial_output(self, output_path: str) -> str:
+        """Create the output directory and return the path Markdown is streamed to"""
         output_dir = os.path.dirname(output_path)
         if output_dir and not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        return f"{output_path}.part"
 
     def _cleanup_empty_assets_dir(self):
         """Remove assets directory if it's empty"""
@@ -315,3 +415,8 @@ class DocxToMarkdownConverter:
                         f"Assets directory not empty, keeping: {self.assets_dir}")
             except OSError as e:
                 logger.debug(f"Could not remove assets directory: {e}")
+
+
+def _blob_provider(part: Any) -> Callable[[], bytes]:
+    """Zero-argument callable returning the bytes of an image part on demand"""
+    return lambda: part.blob
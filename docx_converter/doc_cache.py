@@ -0,0 +1,210 @@
+"""
+Persistent cache of .doc to .docx conversions.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+from .libreoffice import find_soffice_executable
+
+logger = logging.getLogger(__name__)
+
+_VERSIONS_FILE = 'soffice_versions.json'
+# Eviction frees space down to this fraction of the size limit
+EVICT_TO_FRACTION = 0.9
+
+
+class DocConversionCache:
+    """On-disk cache of LibreOffice conversions keyed by .doc content and soffice version
+
+    Entries are stored as <dir>/<key[:2]>/<key>.docx. Reading an entry refreshes its
+    modification time, and the least recently used entries are evicted once the cache
+    grows beyond max_size bytes. Sizes and recency are indexed on the first put()
+    and kept up to date in memory, so the directory is only walked again when the
+    running total exceeds max_size. Entries can be evicted by any later put() (of this
+    or another process), so callers convert from their own copy of an entry.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = 1024 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._soffice_version: Optional[str] = None
+        # Entry path -> (last use, size), loaded on the first put()
+        self._entries: Optional[Dict[str, Tuple[float, int]]] = None
+        self._total_size = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key_for(self, doc_path: str) -> str:
+        """Cache key of a .doc file: hash of its bytes and the LibreOffice version"""
+        digest = hashlib.sha256()
+        digest.update(self._get_soffice_version().encode('utf-8'))
+        digest.update(b'\0')
+        with open(doc_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, key: str, copy_to: Optional[str] = None) -> Optional[str]:
+        """
+        Look up a cached conversion
+
+        Args:
+            key: Cache key from key_for()
+            copy_to: Copy the entry to this path, so it stays available even if
+                the entry is evicted before it is used
+
+        Returns:
+            Path of the cached .docx (copy_to when given), or None on a miss
+        """
+        path = self._entry_path(key)
+        try:
+            # Refresh recency for LRU eviction
+            os.utime(path, None)
+            if copy_to:
+                shutil.copyfile(path, copy_to)
+        except OSError:
+            return None
+        if self._entries is not None and path in self._entries:
+            self._entries[path] = (time.time(), self._entries[path][1])
+        if copy_to:
+            path = copy_to
+        logger.debug(f"Doc conversion cache hit: {key}")
+        return path
+
+    def put(self, key: str, docx_path: str) -> bool:
+        """
+        Store a copy of a converted .docx under key
+
+        docx_path itself is left alone, so callers keep converting from it.
+
+        Returns:
+            False if the file is larger than the whole cache and was not stored
+        """
+        size = os.path.getsize(docx_path)
+        if size > self.max_size:
+            logger.debug(f"Not caching {docx_path}: larger than the cache size limit")
+            return False
+        if self._entries is None:
+            self._scan()
+
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        temp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        try:
+            shutil.copyfile(docx_path, temp_path)
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        previous = self._entries.get(path)
+        self._entries[path] = (time.time(), size)
+        self._total_size += size - (previous[1] if previous else 0)
+        if self._total_size > self.max_size:
+            self._evict(keep=path)
+        return True
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.docx")
+
+    def _scan(self) -> None:
+        """Rebuild the index of entries (recency, size) and the total size from disk"""
+        self._entries = {}
+        self._total_size = 0
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith('.docx'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                self._entries[entry.path] = (stat.st_mtime, stat.st_size)
+                self._total_size += stat.st_size
+
+    def _evict(self, keep: str) -> None:
+        """
+        Remove least recently used entries until the cache is back under its limit
+
+        The directory is rescanned first since other processes may share the cache.
+        Eviction goes down to EVICT_TO_FRACTION of max_size, so a full cache is not
+        rescanned on every put().
+
+        Args:
+            keep: Entry that must stay (the one just stored)
+        """
+        self._scan()
+        if self._total_size <= self.max_size:
+            return
+
+        target_size = self.max_size * EVICT_TO_FRACTION
+        by_recency = sorted(self._entries.items(), key=lambda item: item[1][0])
+        for path, (_, size) in by_recency:
+            if self._total_size <= target_size:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                logger.debug(f"Evicted doc conversion cache entry: {path}")
+            except FileNotFoundError:
+                pass  # Already evicted by another process
+            except OSError:
+                continue
+            del self._entries[path]
+            self._total_size -= size
+
+    def _get_soffice_version(self) -> str:
+        """Get the LibreOffice version, remembered per executable in the cache directory"""
+        if self._soffice_version is not None:
+            return self._soffice_version
+
+        soffice_path = find_soffice_executable()
+        try:
+            stat = os.stat(soffice_path)
+            executable_id = f"{os.path.realpath(soffice_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        except OSError:
+            executable_id = soffice_path
+
+        versions_path = os.path.join(self.cache_dir, _VERSIONS_FILE)
+        versions: Dict[str, str] = {}
+        try:
+            with open(versions_path, 'r', encoding='utf-8') as f:
+                versions = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        version = versions.get(executable_id)
+        if version is None:
+            try:
+                result = subprocess.run([soffice_path, '--version'], check=True,
+                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                version = result.stdout.decode(
+                    'utf-8', errors='replace').strip() or executable_id
+            except (OSError, subprocess.CalledProcessError):
+                version = executable_id
+
+            versions[executable_id] = version
+            temp_path = f"{versions_path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(versions, f, indent=2)
+                os.replace(temp_path, versions_path)
+            except OSError:
+                pass
+
+        self._soffice_version = version
+        return version
@@ -2,15 +2,21 @@
 Document processing module for handling main document conversion.
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Optional, Union
 
+from .document_scanner import DocumentScan, ParagraphFacts, scan_document
+from .formatting import relationship_targets
+from .heading_matcher import HeadingMatcher
+from .markdown_writer import MarkdownWriter
+from .numbering_index import NumberingIndex
 from .paragraph_processor import ParagraphProcessor
+from .profiling import ConversionStats
+from .style_index import StyleIndex
 from .table_processor import TableProcessor
-from .utils import find_font_size_based_headings
+from .utils import analyze_font_size_hierarchy
 
 try:
     from docx.table import Table
-    from docx.text.paragraph import Paragraph
 except ImportError:
     print("Error: Missing required library. Please run: pip install python-docx")
     import sys
@@ -20,131 +26,95 @@ except ImportError:
 class DocumentProcessor:
     """Handles main document processing and coordination"""
 
-    def __init__(self, image_extractor, output_lines: List[str]):
+    def __init__(self, image_extractor, output_lines: MarkdownWriter,
+                 stats: Optional[ConversionStats] = None,
+                 heading_matcher: Optional[HeadingMatcher] = None, text_only: bool = False):
         self.output_lines = output_lines
+        self.stats = stats if stats is not None else ConversionStats()
+        # Text-only mode: run formatting and drawings are not scanned and
+        # hyperlinks are not resolved
+        self.text_only = text_only
         self.paragraph_processor = ParagraphProcessor(
-            image_extractor, output_lines)
-        self.table_processor = TableProcessor(output_lines)
+            image_extractor, output_lines, heading_matcher, text_only)
+        self.table_processor = TableProcessor(
+            output_lines, self.paragraph_processor.text_formatter)
         self.font_size_headings: Dict[float, int] = {}
+        self.title_found = False
+        self.first_heading_found = False
 
     def convert_document(self, doc: Any) -> None:
         """Convert main document content"""
-        # First check if there are Title style paragraphs, if so use as main title
-        title_found = self._check_for_title_style(doc)
+        # Resolve styles once, then collect per-paragraph facts in a single pass over the body
+        with self.stats.stage('scan'):
+            style_index = StyleIndex.from_document(doc)
+            numbering = NumberingIndex.from_document(doc, style_index)
+            scan = scan_document(doc, style_index, self.text_only)
+            link_targets = {} if self.text_only else relationship_targets(doc.part)
 
-        # Check if there are any heading styles in the document
-        heading_styles_found = self._check_for_heading_styles(doc)
+            self.begin_document(style_index, link_targets, scan, numbering)
+
+        # Process all document elements
+        with self.stats.stage('render'):
+            for block in scan.blocks:
+                self.convert_block(block)
+
+    def begin_document(self, style_index: StyleIndex, link_targets: Dict[str, str],
+                       scan: DocumentScan, numbering: Optional[NumberingIndex] = None) -> None:
+        """Prepare processors for a document from its styles, numbering, links and scan results"""
+        self.paragraph_processor.set_style_index(style_index)
+        self.paragraph_processor.set_numbering(numbering or NumberingIndex())
+        self.paragraph_processor.set_link_targets(link_targets)
+
+        # If Title style paragraphs exist, use them as main title
+        self.title_found = scan.title_found
+        self.first_heading_found = False
 
         # If no heading styles found, analyze font sizes to create heading hierarchy
-        if not heading_styles_found:
-            self.font_size_headings = find_font_size_based_headings(doc)
+        if not scan.heading_styles_found:
+            self.font_size_headings = analyze_font_size_hierarchy(
+                scan.font_size_counts)
 
         # Set heading offset: if Title style exists, all headings are adjusted down one level
-        heading_offset = 1 if title_found else 0
+        heading_offset = 1 if self.title_found else 0
         self.paragraph_processor.set_heading_offset(heading_offset)
         self.paragraph_processor.set_font_size_headings(
             self.font_size_headings)
 
-        # Process all document elements
-        first_heading_found = False
-        for element in doc.element.body:
-            if element.tag.endswith('p'):  # Paragraph
-                paragraph = Paragraph(element, doc)
-                style_name = paragraph.style.name.lower(
-                ) if paragraph.style and paragraph.style.name else ''
-
-                # Check Title style
-                if 'title' in style_name and paragraph.text.strip():
-                    self.output_lines.append(f"# {paragraph.text.strip()}")
-                    self.output_lines.append('')
-                    continue
-
-                # If no Title, first Heading 1 becomes main title
-                if not title_found and not first_heading_found and 'heading 1' in style_name and paragraph.text.strip():
-                    self.output_lines.append(f"# {paragraph.text.strip()}")
-                    self.output_lines.append('')
-                    first_heading_found = True
-                    continue
-
-                self.paragraph_processor.convert_paragraph(paragraph)
-
-            elif element.tag.endswith('tbl'):  # Table
-                table = Table(element, doc)
-                self.table_processor.convert_table(table)
-
-        # Post-process to fix heading levels and punctuation
-        self._fix_heading_levels()
-
-    def _fix_heading_levels(self) -> None:
-        """Fix heading level jumps and remove punctuation from headings"""
-        import re
-
-        lines = self.output_lines[:]
-        self.output_lines.clear()
-
-        last_heading_level = 0
-
-        for line in lines:
-            # Check if this is a heading line
-            heading_match = re.match(r'^(#{1,6})\s+(.+)$', line)
-
-            if heading_match:
-                current_hashes = heading_match.group(1)
-                heading_text = heading_match.group(2)
-                current_level = len(current_hashes)
-
-                # Fix heading level jumps (MD001)
-                if last_heading_level > 0:  # Not the first heading
-                    max_allowed_level = last_heading_level + 1
-                    if current_level > max_allowed_level:
-                        # Reduce level to avoid jumping
-                        current_level = max_allowed_level
-                        current_hashes = '#' * current_level
-
-                # Clean heading text - remove trailing punctuation
-                clean_heading_text = self._clean_heading_text(heading_text)
-
-                # Update the line with fixed level and clean text
-                fixed_line = f"{current_hashes} {clean_heading_text}"
-                self.output_lines.append(fixed_line)
-
-                last_heading_level = current_level
-            else:
-                # Not a heading, keep as is
-                self.output_lines.append(line)
-
-    def _clean_heading_text(self, text: str) -> str:
-        """Remove trailing punctuation from heading text"""
-        import re
-
-        # Remove trailing punctuation like 。！？：；，
-        text = re.sub(r'[。！？：；，]+$', '', text.strip())
-
-        # Also remove trailing colons and periods in English
-        text = re.sub(r'[:\.]+$', '', text.strip())
-
-        return text.strip()
-
-    def _check_for_title_style(self, doc: Any) -> bool:
-        """Check if document contains Title style paragraphs"""
-        for element in doc.element.body:
-            if element.tag.endswith('p'):  # Paragraph
-                paragraph = Paragraph(element, doc)
-                style_name = paragraph.style.name.lower(
-                ) if paragraph.style and paragraph.style.name else ''
-
-                if 'title' in style_name and paragraph.text.strip():
-                    return True
-        return False
-
-    def _check_for_heading_styles(self, doc: Any) -> bool:
-        """Check if document contains any Heading style paragraphs"""
-        for element in doc.element.body:
-            if element.tag.endswith('p'):  # Paragraph
-                paragraph = Paragraph(element, doc)
-                style_name = paragraph.style.name.lower(
-                ) if paragraph.style and paragraph.style.name else ''
-
-                if 'heading' in style_name and paragraph.text.strip():
-                    return True
-        return False
+    def convert_block(self, block: Union[ParagraphFacts, Table]) -> None:
+        """Convert one top-level paragraph or table"""
+        if isinstance(block, ParagraphFacts):
+            self.stats.enter('paragraphs')
+            try:
+                self._convert_paragraph_block(block)
+            finally:
+                self.stats.exit()
+            self.stats.count('paragraphs')
+            self.stats.count('runs', block.run_count)
+
+        else:  # Table
+            self.stats.enter('tables')
+            try:
+                cell_count = self.table_processor.convert_table(block)
+            finally:
+                self.stats.exit()
+            self.stats.count('tables')
+            self.stats.count('cells', cell_count)
+
+    def _convert_paragraph_block(self, block: ParagraphFacts) -> None:
+        """Convert a top-level paragraph, promoting the document title"""
+        style_name = block.style_name
+
+        # Check Title style
+        if 'title' in style_name and block.text:
+            self.output_lines.append(f"# {block.text}")
+            self.output_lines.append('')
+            return
+
+        # If no Title, first Heading 1 becomes main title
+        if not self.title_found and not self.first_heading_found and 'heading 1' in style_name and block.text:
+            self.output_lines.append(f"# {block.text}")
+            self.output_lines.append('')
+            self.first_heading_found = True
+            return
+
+        self.paragraph_processor.convert_paragraph(block)
@@ -0,0 +1,181 @@
+"""
+Document scanning module that collects per-paragraph facts in a single pass.
+"""
+
+from collections import Counter
+from typing import Any, List, Optional, Union
+
+from .style_index import StyleIndex, StyleInfo, parse_numbering_properties
+from .utils import get_paragraph_text, get_run_text
+
+try:
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+except ImportError:
+    print("Error: Missing required library. Please run: pip install python-docx")
+    import sys
+    sys.exit(1)
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+R_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+W_DRAWING = f'{W_NS}drawing'
+W_PICT = f'{W_NS}pict'
+A_BLIP = '{http://schemas.openxmlformats.org/drawingml/2006/main}blip'
+V_IMAGEDATA = '{urn:schemas-microsoft-com:vml}imagedata'
+O_RELID = '{urn:schemas-microsoft-com:office:office}relid'
+
+
+class ParagraphFacts:
+    """Compact record of everything the converter needs to know about a paragraph"""
+
+    __slots__ = ('paragraph', 'style', 'text', 'has_numpr', 'num_id', 'ilvl',
+                 'font_size', 'uniform_font_size', 'has_drawing', 'drawings', 'run_count')
+
+    def __init__(self, paragraph: Paragraph, style: StyleInfo):
+        self.paragraph = paragraph
+        self.style = style
+        self.text = ''
+        self.has_numpr = False
+        self.num_id: Optional[int] = None
+        self.ilvl: Optional[int] = None
+        self.font_size: Optional[float] = None
+        self.uniform_font_size = True
+        self.has_drawing = False
+        # Image relationship IDs per w:drawing/w:pict element, in document order;
+        # None where an image element has no relationship
+        self.drawings: List[List[Optional[str]]] = []
+        self.run_count = 0
+
+    @property
+    def element(self):
+        return self.paragraph._element
+
+    @property
+    def style_name(self) -> str:
+        """Normalized (lower case) style name"""
+        return self.style.name
+
+
+def collect_paragraph_facts(paragraph: Paragraph, style_index: StyleIndex,
+                            text_only: bool = False) -> ParagraphFacts:
+    """
+    Collect the facts of a single paragraph, touching its element once
+
+    Args:
+        paragraph: Paragraph to scan
+        style_index: Styles of the document
+        text_only: Only collect text, style and numbering: run formatting is not
+            resolved (no font sizes) and drawings are not indexed
+
+    Returns:
+        ParagraphFacts of the paragraph
+    """
+    element = paragraph._element
+    style = style_index.paragraph_style_of(element)
+    facts = ParagraphFacts(paragraph, style)
+
+    # Text (stripped, as every consumer wants it)
+    facts.text = get_paragraph_text(element).strip()
+
+    # Numbering properties: direct numPr, completed by the paragraph style's numbering
+    pPr = element.pPr
+    if pPr is not None:
+        numPr = pPr.find(f'.//{W_NS}numPr')
+        if numPr is not None:
+            facts.has_numpr = True
+            facts.num_id, facts.ilvl = parse_numbering_properties(numPr)
+    if style.num_id is not None:
+        if facts.num_id is None:
+            facts.num_id = style.num_id
+        if facts.ilvl is None:
+            facts.ilvl = style.ilvl
+
+    # Font sizes (including inherited ones): dominant size over all sized runs,
+    # uniformity over runs with text
+    if text_only:
+        facts.run_count = len(element.r_lst)
+        return facts
+
+    all_sizes = []
+    text_sizes = set()
+    for r in element.r_lst:
+        facts.run_count += 1
+        size = style_index.effective_run_format(r, style).size
+        if size:
+            all_sizes.append(size)
+            if get_run_text(r).strip():
+                text_sizes.add(size)
+    if all_sizes:
+        facts.font_size = Counter(all_sizes).most_common(1)[0][0]
+    facts.uniform_font_size = len(text_sizes) <= 1
+
+    # Drawings (new format) and picts (old format) with the images they reference
+    for node in element.iter(W_DRAWING, W_PICT, A_BLIP, V_IMAGEDATA):
+        if node.tag == W_DRAWING or node.tag == W_PICT:
+            facts.drawings.append([])
+        elif facts.drawings:
+            facts.drawings[-1].append(_image_rel_id(node))
+    facts.has_drawing = bool(facts.drawings)
+
+    return facts
+
+
+def _image_rel_id(node: Any) -> Optional[str]:
+    """Relationship ID of an a:blip (embedded before linked) or v:imagedata element"""
+    if node.tag == A_BLIP:
+        return node.get(f'{R_NS}embed') or node.get(f'{R_NS}link')
+    return node.get(f'{R_NS}id') or node.get(O_RELID)
+
+
+class DocumentScan:
+    """Result of a single scan over the document body"""
+
+    def __init__(self, keep_blocks: bool = True):
+        """
+        Args:
+            keep_blocks: Keep every scanned block for rendering; streaming engines
+                only need the document-level decisions
+        """
+        self.keep_blocks = keep_blocks
+        self.blocks: List[Union[ParagraphFacts, Table]] = []
+        self.title_found = False
+        self.heading_styles_found = False
+        # Font size -> number of candidate paragraphs for font-size based headings
+        self.font_size_counts: Counter = Counter()
+
+    def add_paragraph(self, facts: ParagraphFacts) -> None:
+        """Record a paragraph and update document-level decisions"""
+        if self.keep_blocks:
+            self.blocks.append(facts)
+
+        if not facts.text:
+            return
+
+        style_name = facts.style_name
+        if 'title' in style_name:
+            self.title_found = True
+        if 'heading' in style_name:
+            self.heading_styles_found = True
+
+        # Candidates for font-size based headings: uniform, sized, non-heading paragraphs
+        if 'heading' in style_name or 'title' in style_name:
+            return
+        if facts.uniform_font_size and facts.font_size:
+            self.font_size_counts[facts.font_size] += 1
+
+    def add_table(self, table: Table) -> None:
+        """Record a table"""
+        if self.keep_blocks:
+            self.blocks.append(table)
+
+
+def scan_document(doc: Any, style_index: StyleIndex, text_only: bool = False) -> DocumentScan:
+    """Walk the document body once and collect facts for every block"""
+    scan = DocumentScan()
+    for element in doc.element.body:
+        if element.tag.endswith('p'):  # Paragraph
+            scan.add_paragraph(collect_paragraph_facts(
+                Paragraph(element, doc), style_index, text_only))
+        elif element.tag.endswith('tbl'):  # Table
+            scan.add_table(Table(element, doc))
+    return scan
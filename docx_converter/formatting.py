@@ -2,9 +2,11 @@
 Text formatting module for converting Word formatting to Markdown.
 """
 
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from .utils import merge_adjacent_tags
+from .document_scanner import ParagraphFacts
+from .style_index import StyleIndex
+from .utils import get_paragraph_text, get_run_text
 
 try:
     from docx.text.paragraph import Paragraph
@@ -13,10 +15,30 @@ except ImportError:
     import sys
     sys.exit(1)
 
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_R = f'{W_NS}r'
+W_HYPERLINK = f'{W_NS}hyperlink'
+R_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+
 
 class TextFormatter:
     """Handles text formatting conversion from Word to Markdown"""
 
+    def __init__(self, text_only: bool = False,
+                 cleanup: Optional[Callable[[str], str]] = None):
+        """
+        Args:
+            text_only: Emit the plain paragraph text, without inline formatting
+                and hyperlinks
+            cleanup: Applied to each formatted paragraph, e.g. the 'formatted'
+                cleanup stages of a MarkdownWriter
+        """
+        self.text_only = text_only
+        self.cleanup = cleanup
+        self.style_index = StyleIndex()
+        # Relationship ID -> target of the document part, resolved once per document
+        self.link_targets: Dict[str, str] = {}
+
     def convert_paragraph_formatting(self, paragraph: Paragraph, custom_text: Optional[str] = None) -> str:
         """
         Convert paragraph formatting (bold, italic, links, etc.)
@@ -32,116 +54,147 @@ class TextFormatter:
             # If custom text is provided, use simplified processing
             return custom_text
 
-        # First check if the entire paragraph is a hyperlink
-        hyperlink_result = self._process_paragraph_hyperlinks(paragraph)
-        if hyperlink_result:
-            return hyperlink_result
-
-        result = []
-        for run in paragraph.runs:
-            text = run.text
+        if self.text_only:
+            # No run formatting or relationship lookups at all
+            return get_paragraph_text(paragraph._element)
+
+        paragraph_style = self.style_index.paragraph_style_of(
+            paragraph._element)
+
+        result: List[str] = []
+        link_url: Optional[str] = None
+        link_parts: List[str] = []
+        # Consecutive runs with identical effective formatting and link are
+        # coalesced into one segment, so Word's run splits don't become **a****b**
+        segment_key: Optional[Tuple[Any, ...]] = None
+        segment_parts: List[str] = []
+        for run_element, url in self._iter_runs(paragraph._element, self.link_targets):
+            text = get_run_text(run_element)
             if not text:
                 continue
 
-            # Check if run contains hyperlink
-            hyperlink = self._get_hyperlink(run, paragraph)
+            # Formatting, including values inherited from styles
+            run_format = self.style_index.effective_run_format(
+                run_element, paragraph_style)
+            key = (run_format.bold is True, run_format.italic is True,
+                   run_format.underline is True, url)
+            if key == segment_key:
+                segment_parts.append(text)
+                continue
 
-            # Apply formatting
-            if run.bold:
-                text = f"**{text}**"
-            if run.italic:
-                text = f"*{text}*"
-            if run.underline:
-                text = f"<u>{text}</u>"
+            if segment_parts:
+                link_url = self._emit_segment(
+                    result, segment_key, segment_parts, link_url, link_parts)
+            segment_key = key
+            segment_parts = [text]
+
+        if segment_parts:
+            link_url = self._emit_segment(
+                result, segment_key, segment_parts, link_url, link_parts)
+        self._flush_link(result, link_url, link_parts)
+        # Whitespace kept outside the markers must not end the line: trailing
+        # spaces change Markdown rendering (two of them are a hard break)
+        text = ''.join(result).rstrip()
+        # e.g. merge adjacent tags of the same type
+        return self.cleanup(text) if self.cleanup else text
+
+    def convert_facts(self, facts: ParagraphFacts) -> str:
+        """
+        Convert a scanned paragraph
 
-            # Apply hyperlink formatting
-            if hyperlink:
-                text = f"[{text}]({hyperlink})"
+        In text-only mode the scanned text is reused instead of walking the runs
+        again.
+        """
+        if self.text_only:
+            return facts.text
+        return self.convert_paragraph_formatting(facts.paragraph)
 
-            result.append(text)        # Merge adjacent same HTML tags
-        final_result = ''.join(result)
+    def _iter_runs(self, p_element, link_targets: Dict[str, str]) -> List[Tuple[Any, Optional[str]]]:
+        """
+        Resolve the paragraph's runs and <w:hyperlink> children once
 
-        # Merge adjacent tags of same type
-        final_result = merge_adjacent_tags(final_result)
+        Returns:
+            List of (run element, hyperlink URL or None) in document order
+        """
+        runs = []
+        for child in p_element.iterchildren(W_R, W_HYPERLINK):
+            if child.tag == W_R:
+                runs.append((child, None))
+                continue
 
-        return final_result
+            url = link_targets.get(child.get(R_ID, ''))
+            for run_element in child.iterchildren(W_R):
+                runs.append((run_element, url))
+        return runs
 
-    def _get_hyperlink(self, run, paragraph) -> Optional[str]:
-        """Extract hyperlink URL from run"""
-        try:
-            # Check if the run is part of a hyperlink
-            element = run._element
-
-            # Check the run's parent paragraph for hyperlink elements
-            para_element = paragraph._element
-            for child in para_element.iter():
-                if child.tag.endswith('hyperlink'):
-                    # Check if this hyperlink contains our run
-                    for run_elem in child.iter():
-                        if run_elem == element or element in list(run_elem.iter()):
-                            # Get the relationship ID
-                            rel_id = child.get(
-                                '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
-                            if rel_id:
-                                try:
-                                    part = paragraph.part
-                                    rel = part.rels[rel_id]
-                                    return rel.target_ref
-                                except (KeyError, AttributeError):
-                                    pass
-                            break
-
-            # Also check if the run element itself is within a hyperlink by traversing up
-            current = element
-            while current is not None:
-                if current.tag.endswith('hyperlink'):
-                    rel_id = current.get(
-                        '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
-                    if rel_id:
-                        try:
-                            part = paragraph.part
-                            rel = part.rels[rel_id]
-                            return rel.target_ref
-                        except (KeyError, AttributeError):
-                            pass
-                    break
-                current = current.getparent()
-
-        except Exception:
-            # If any error occurs during hyperlink extraction, return None
-            pass
+    def _emit_segment(self, result: List[str], key: Tuple[Any, ...], parts: List[str],
+                      link_url: Optional[str], link_parts: List[str]) -> Optional[str]:
+        """
+        Format a segment of coalesced runs and emit or buffer it
 
-        return None
+        Consecutive segments of the same hyperlink become a single link.
 
-    def _process_paragraph_hyperlinks(self, paragraph) -> Optional[str]:
-        """Process paragraph-level hyperlinks that contain the entire paragraph text"""
+        Returns:
+            URL of the hyperlink being buffered
+        """
+        bold, italic, underline, url = key
+        text = _apply_format(''.join(parts), bold, italic, underline)
+        if url != link_url:
+            self._flush_link(result, link_url, link_parts)
+        if url:
+            link_parts.append(text)
+        else:
+            result.append(text)
+        return url
+
+    def _flush_link(self, result: List[str], url: Optional[str], parts: List[str]) -> None:
+        """Emit buffered hyperlink text as a Markdown link"""
+        if not parts:
+            return
+
+        link_text = ''.join(parts)
+        parts.clear()
+        stripped = link_text.strip()
+        if not url or not stripped:
+            result.append(link_text)
+            return
+
+        # Keep surrounding whitespace outside of the link brackets
+        leading = link_text[:len(link_text) - len(link_text.lstrip())]
+        trailing = link_text[len(link_text.rstrip()):]
+        result.append(f"{leading}[{stripped}]({url}){trailing}")
+
+
+def _apply_format(text: str, bold: bool, italic: bool, underline: bool) -> str:
+    """Wrap text in Markdown/HTML markers, keeping surrounding whitespace outside"""
+    if not (bold or italic or underline):
+        return text
+    if not text[0].isspace() and not text[-1].isspace():
+        # Common case: no surrounding whitespace to keep outside
+        leading = trailing = ''
+        core = text
+    else:
+        core = text.strip()
+        if not core:
+            return text
+        leading = text[:len(text) - len(text.lstrip())]
+        trailing = text[len(text.rstrip()):]
+
+    if bold:
+        core = f"**{core}**"
+    if italic:
+        core = f"*{core}*"
+    if underline:
+        core = f"<u>{core}</u>"
+    return f"{leading}{core}{trailing}"
+
+
+def relationship_targets(part: Any) -> Dict[str, str]:
+    """Build the relationship ID to target table of a python-docx part"""
+    targets = {}
+    for rel_id, rel in part.rels.items():
         try:
-            para_element = paragraph._element
-
-            # Look for hyperlink elements in the paragraph
-            for child in para_element.iter():
-                if child.tag.endswith('hyperlink'):
-                    # Get the relationship ID
-                    rel_id = child.get(
-                        '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
-                    if rel_id:
-                        try:
-                            part = paragraph.part
-                            rel = part.rels[rel_id]
-                            url = rel.target_ref
-
-                            # Extract all text from the hyperlink element
-                            hyperlink_text = ""
-                            for text_elem in child.iter():
-                                if text_elem.tag.endswith('t') and text_elem.text:
-                                    hyperlink_text += text_elem.text
-
-                            if hyperlink_text.strip():
-                                return f"[{hyperlink_text.strip()}]({url})"
-                        except (KeyError, AttributeError):
-                            pass
-
-        except Exception:
+            targets[rel_id] = rel.target_ref
+        except AttributeError:
             pass
-
-        return None
+    return targets
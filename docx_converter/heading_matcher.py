@@ -0,0 +1,152 @@
+"""
+Heading heuristics for paragraphs that are not styled as headings.
+
+Patterns are compiled once, and each keyword set is compiled into a single
+regular expression alternation, so keyword lookups run in the regex engine
+instead of a Python loop per keyword or per character.
+"""
+
+import json
+import re
+from typing import Dict, Iterable, List, Optional, Pattern
+
+# Numbered paragraphs like "1. 基础力学入门"
+NUMBERED_PATTERN = re.compile(r'^\d+\.\s+')
+# Numbered paragraph with a section character before the first sentence punctuation
+SECTION_NUMBER_PATTERN = re.compile(
+    r'^\d+\.\s+[^，。！？；：]*[入门|介绍|概述|基础|原理|设计|分析|方法|系统|结构|材料|工艺]')
+# Chinese section numbers like "一、"
+CHINESE_SECTION_PATTERN = re.compile(r'^[一二三四五六七八九十]+、')
+# Text patterns that look like headings (for bold/formatted text only)
+HEADING_PATTERN = re.compile(
+    r'^[一二三四五六七八九十]+、\s*'  # Chinese numbers like "一、"
+    r'|^[第]\d+[章节部分]\s*'  # Like "第1章"
+    r'|^[课程|培训|内容|说明|工具|资源|考核]')  # Common heading words at start
+
+# Numbered paragraphs containing one of these are section headings rather than
+# list items ("1. Object 1" stays a list item)
+DEFAULT_SECTION_KEYWORDS = (
+    '入门', '介绍', '概述', '基础', '原理', '设计', '分析', '方法', '系统', '结构', '材料', '工艺',
+    '课程', '培训', '学习', '知识', '技能', '理论', '实践', '应用')
+# Short bold paragraphs containing one of these are headings
+DEFAULT_HEADING_KEYWORDS = (
+    '入门', '基础', '课程', '培训', '工具', '软件', '资源', '概述', '介绍', '说明', '内容', '考核')
+# Bold paragraphs starting with one of these are headings
+DEFAULT_HEADING_STARTERS = ('最终考核：', '软件工具', '在线资源', '具体内容', '培训课程', '核心知识')
+
+# Longest text still considered a short, descriptive heading
+MAX_KEYWORD_HEADING_LENGTH = 100
+
+KEYWORD_SETS = ('section_keywords', 'heading_keywords', 'heading_starters')
+
+
+def compile_keywords(keywords: Iterable[str]) -> Optional[Pattern]:
+    """
+    Compile keywords into one alternation matching any of them
+
+    Args:
+        keywords: Literal keywords
+
+    Returns:
+        Compiled pattern, or None when there are no keywords
+    """
+    unique = sorted({keyword for keyword in keywords if keyword})
+    if not unique:
+        return None
+    return re.compile('|'.join(map(re.escape, unique)))
+
+
+class HeadingClass:
+    """Heading heuristics of one paragraph text"""
+
+    __slots__ = ('section_number', 'heading_level')
+
+    def __init__(self, section_number: bool = False, heading_level: int = 0):
+        # Numbered section title ("1. 基础力学入门") rather than a list item
+        self.section_number = section_number
+        # Level if the text looks like a heading when formatted bold, 0 otherwise
+        self.heading_level = heading_level
+
+
+class HeadingMatcher:
+    """Classifies paragraph texts as section numbers or heading-like text"""
+
+    def __init__(self, section_keywords: Optional[Iterable[str]] = None,
+                 heading_keywords: Optional[Iterable[str]] = None,
+                 heading_starters: Optional[Iterable[str]] = None):
+        """
+        Args:
+            section_keywords: Keywords making a numbered paragraph a section heading
+            heading_keywords: Keywords making a short bold paragraph a heading
+            heading_starters: Prefixes making a bold paragraph a heading
+        """
+        self.section_keywords = tuple(
+            DEFAULT_SECTION_KEYWORDS if section_keywords is None else section_keywords)
+        self.heading_keywords = tuple(
+            DEFAULT_HEADING_KEYWORDS if heading_keywords is None else heading_keywords)
+        self.heading_starters = tuple(
+            DEFAULT_HEADING_STARTERS if heading_starters is None else heading_starters)
+        self._section_pattern = compile_keywords(self.section_keywords)
+        self._heading_pattern = compile_keywords(self.heading_keywords)
+
+    def classify(self, text: str) -> HeadingClass:
+        """
+        Classify a (stripped) paragraph text
+
+        Args:
+            text: Paragraph text
+
+        Returns:
+            HeadingClass of the text
+        """
+        numbered = NUMBERED_PATTERN.match(text) is not None
+        section_number = numbered and SECTION_NUMBER_PATTERN.match(text) is not None
+
+        length = len(text.strip())
+        heading_like = length > 0 and (
+            HEADING_PATTERN.match(text) is not None
+            or text.startswith(self.heading_starters))
+        short = (not heading_like and 0 < length <= MAX_KEYWORD_HEADING_LENGTH
+                 and not text.endswith('。'))
+
+        # Only look for the keyword sets that can still change the result
+        if numbered and not section_number and self._section_pattern is not None:
+            section_number = self._section_pattern.search(text) is not None
+        if short and self._heading_pattern is not None:
+            heading_like = self._heading_pattern.search(text) is not None
+
+        heading_level = 0
+        if heading_like:
+            # Chinese section numbers (一、二、三、) are main sections, other
+            # formatted headings all get the same level
+            heading_level = 2 if CHINESE_SECTION_PATTERN.match(text) else 3
+        return HeadingClass(section_number, heading_level)
+
+
+def load_heading_keywords(path: str) -> Dict[str, List[str]]:
+    """
+    Load heading keyword sets from a JSON file
+
+    The file holds an object with any of the keys "section_keywords",
+    "heading_keywords" and "heading_starters" (lists of strings); missing keys
+    keep the defaults.
+
+    Args:
+        path: JSON file path
+
+    Returns:
+        Keyword sets, usable as HeadingMatcher(**keyword_sets)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError(f"Heading keyword file must hold a JSON object: {path}")
+
+    unknown = set(config) - set(KEYWORD_SETS)
+    if unknown:
+        raise ValueError(
+            f"Unknown keys in heading keyword file {path}: {', '.join(sorted(unknown))}")
+    for key, keywords in config.items():
+        if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+            raise ValueError(f"'{key}' in {path} must be a list of strings")
+    return config
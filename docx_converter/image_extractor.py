@@ -2,12 +2,15 @@
 Image extraction module for DOCX files.
 """
 
+import hashlib
+import io
 import logging
 import os
 import shutil
-import xml.etree.ElementTree as ET
-import zipfile
-from typing import Dict, Optional
+import uuid
+from typing import IO, Any, Dict, Optional, Set, Tuple
+
+from .package import ZipMember, ZipPackage
 
 logger = logging.getLogger(__name__)
 
@@ -15,89 +18,234 @@ logger = logging.getLogger(__name__)
 class ImageExtractor:
     """Handles image extraction from DOCX files"""
 
-    def __init__(self, assets_dir: str):
+    def __init__(self, assets_dir: Optional[str], lazy: bool = False, hash_names: bool = False,
+                 shared_assets_dir: Optional[str] = None, shared_assets_mode: str = 'hardlink',
+                 in_memory: bool = False):
+        """
+        Args:
+            assets_dir: Directory the document's images are written to
+            lazy: Only write images when they are first referenced
+            hash_names: Name images by content hash and write each unique blob once
+            shared_assets_dir: Directory shared by a batch of documents holding the
+                unique blobs (implies hash_names)
+            shared_assets_mode: 'hardlink' to link shared blobs into assets_dir,
+                'relative' to reference the shared directory directly
+            in_memory: Keep images as lazy parts in self.assets instead of writing them
+        """
+        if shared_assets_mode not in ('hardlink', 'relative'):
+            raise ValueError(
+                f"Unknown shared assets mode: {shared_assets_mode}")
+
         self.assets_dir = assets_dir
+        # In lazy mode images are only written when first referenced
+        self.lazy = lazy
+        self.hash_names = hash_names or bool(shared_assets_dir)
+        self.shared_assets_dir = shared_assets_dir
+        self.shared_assets_mode = shared_assets_mode
+        self.in_memory = in_memory
+        # File name -> image part of every image saved (or kept, in in_memory mode)
+        self.assets: Dict[str, Any] = {}
         self.image_counter = 0
         self.image_map: Dict[str, str] = {}
+        # Relationship ID -> URL of linked (external) images
+        self.external_images: Dict[str, str] = {}
+        self._pending: Dict[str, Tuple[Any, str]] = {}
+        self._written: Set[str] = set()
+        self._first_image: Optional[str] = None
 
-    def extract_images(self, docx_path: str) -> None:
+    def extract_images(self, document_part: Any) -> None:
         """
-        Extract images from DOCX file and establish mapping relationship
+        Extract images from the loaded document package and establish mapping relationship
 
         Args:
-            docx_path: Path to the DOCX file
+            document_part: Main document part of the already loaded DOCX package
         """
-        if not self.assets_dir:
+        if not self.assets_dir and not self.in_memory:
             return
 
         try:
-            # Reset image counter and mapping
-            self.image_counter = 0
-            self.image_map = {}
-
-            # DOCX file is actually a ZIP file
-            with zipfile.ZipFile(docx_path, 'r') as docx_zip:
-                # Read relationship file to get image relationship mapping
-                try:
-                    rels_content = docx_zip.read(
-                        'word/_rels/document.xml.rels').decode('utf-8')
-                    rels_root = ET.fromstring(rels_content)
+            # Index media parts by part name once
+            media_parts = self._index_media_parts(document_part.package)
+            self._extract(document_part.rels, media_parts)
+        except Exception as e:
+            logger.warning(f"Error extracting images: {str(e)}")
 
-                    # Establish relationship ID to image file mapping
-                    self._extract_images_with_relationships(
-                        docx_zip, rels_root)
+    def extract_images_from_package(self, package: ZipPackage, document_member: str) -> None:
+        """
+        Extract images straight from the zip package, without loading it through python-docx
 
-                except Exception as e:
-                    logger.warning(
-                        f"Unable to parse image relationships, using fallback method: {e}")
-                    # Fallback method: directly extract all images from media folder
-                    self._extract_images_fallback(docx_zip)
+        Args:
+            package: Opened DOCX package
+            document_member: Zip member name of the main document part
+        """
+        if not self.assets_dir and not self.in_memory:
+            return
 
+        try:
+            media_parts = {
+                f"/{name}": ZipMember(package, name)
+                for name in package.member_names() if name.startswith('word/media/')}
+            self._extract(package.relationships(document_member), media_parts)
         except Exception as e:
             logger.warning(f"Error extracting images: {str(e)}")
 
-    def _extract_images_with_relationships(self, docx_zip: zipfile.ZipFile, rels_root: ET.Element) -> None:
+    def _extract(self, rels: Dict[str, Any], media_parts: Dict[str, Any]) -> None:
+        """Establish the image mapping from document relationships and media parts"""
+        # Reset image counter and mapping
+        self.image_counter = 0
+        self.image_map = {}
+        self.external_images = {}
+        self.assets = {}
+        self._pending = {}
+        self._written = set()
+        self._first_image = None
+
+        try:
+            # Establish relationship ID to image file mapping
+            self._extract_images_with_relationships(rels, media_parts)
+
+        except Exception as e:
+            logger.warning(
+                f"Unable to parse image relationships, using fallback method: {e}")
+            # Fallback method: directly extract all images from media folder
+            self._extract_images_fallback(media_parts)
+
+    def _index_media_parts(self, package: Any) -> Dict[str, Any]:
+        """Map part names under word/media/ to their parts"""
+        media_parts = {}
+        for part in package.iter_parts():
+            partname = str(part.partname)
+            if partname.startswith('/word/media/'):
+                media_parts[partname] = part
+        return media_parts
+
+    def _extract_images_with_relationships(self, rels: Dict[str, Any], media_parts: Dict[str, Any]) -> None:
         """Extract images using relationship mapping"""
-        for rel in rels_root.findall('.//{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'):
-            rel_type = rel.get('Type', '')
-            if 'image' in rel_type.lower():
-                rel_id = rel.get('Id')
-                target = rel.get('Target')
+        for rel_id, rel in rels.items():
+            if 'image' in rel.reltype.lower() and rel.is_external:
+                # Linked image (a:blip r:link, VML imagedata): referenced by URL
+                if rel_id and rel.target_ref:
+                    self.external_images[rel_id] = rel.target_ref
+            elif 'image' in rel.reltype.lower():
+                target = rel.target_ref
                 if target and target.startswith('media/'):
-                    full_path = f"word/{target}"
-                    if full_path in [f.filename for f in docx_zip.filelist]:
-                        # Extract image
-                        self.image_counter += 1
+                    part = media_parts.get(f"/word/{target}")
+                    if part is not None and rel_id:
                         file_ext = os.path.splitext(target)[1].lower()
-                        new_filename = f"image_{self.image_counter:03d}{file_ext}"
-                        output_path = os.path.join(
-                            self.assets_dir, new_filename)
+                        self._register_image(rel_id, part, file_ext)
 
-                        with docx_zip.open(full_path) as source:
-                            with open(output_path, 'wb') as target_file:
-                                shutil.copyfileobj(source, target_file)
+    def _extract_images_fallback(self, media_parts: Dict[str, Any]) -> None:
+        """Fallback method to extract images"""
+        for partname, part in media_parts.items():
+            file_ext = os.path.splitext(partname)[1].lower()
+            if file_ext in ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.svg']:
+                if self.lazy:
+                    # Not referenced by any relationship; only used as generic fallback
+                    self._pending[partname] = (part, file_ext)
+                else:
+                    new_filename = self._save_image(part, file_ext)
+                    logger.info(f"Extracted image: {new_filename}")
+
+    def _register_image(self, rel_id: str, part: Any, file_ext: str) -> None:
+        """Extract an image now, or remember it until it is referenced in lazy mode"""
+        if self.lazy:
+            self._pending[rel_id] = (part, file_ext)
+            return
 
-                        # Establish mapping relationship
-                        if rel_id:
-                            self.image_map[rel_id] = new_filename
-                            logger.info(
-                                f"Extracted image: {new_filename} (ID: {rel_id})")
+        new_filename = self._save_image(part, file_ext)
 
-    def _extract_images_fallback(self, docx_zip: zipfile.ZipFile) -> None:
-        """Fallback method to extract images"""
-        for file_info in docx_zip.filelist:
-            if file_info.filename.startswith('word/media/'):
-                file_ext = os.path.splitext(file_info.filename)[1].lower()
-                if file_ext in ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.svg']:
-                    self.image_counter += 1
-                    new_filename = f"image_{self.image_counter:03d}{file_ext}"
-                    output_path = os.path.join(self.assets_dir, new_filename)
-
-                    with docx_zip.open(file_info.filename) as source:
-                        with open(output_path, 'wb') as target:
-                            shutil.copyfileobj(source, target)
+        # Establish mapping relationship
+        self.image_map[rel_id] = new_filename
+        logger.info(f"Extracted image: {new_filename} (ID: {rel_id})")
 
-                    logger.info(f"Extracted image: {new_filename}")
+    def _materialize(self, key: str) -> str:
+        """Write a pending image on first reference and return its file name"""
+        part, file_ext = self._pending.pop(key)
+        new_filename = self._save_image(part, file_ext)
+        self.image_map[key] = new_filename
+        logger.info(f"Extracted image: {new_filename} (ID: {key})")
+        return new_filename
+
+    def _save_image(self, part: Any, file_ext: str) -> str:
+        """Write an image part to the assets directory and return its file name"""
+        if self.in_memory:
+            new_filename = self._keep_image(part, file_ext)
+        elif self.hash_names:
+            new_filename = self._save_image_by_hash(part, file_ext)
+        else:
+            self.image_counter += 1
+            new_filename = f"image_{self.image_counter:03d}{file_ext}"
+            output_path = os.path.join(self.assets_dir, new_filename)
+
+            with _open_part(part) as source, open(output_path, 'wb') as target_file:
+                shutil.copyfileobj(source, target_file)
+
+        self.assets[new_filename] = part
+        if self._first_image is None:
+            self._first_image = new_filename
+        return new_filename
+
+    def _keep_image(self, part: Any, file_ext: str) -> str:
+        """Name an image without writing anything"""
+        if self.hash_names:
+            new_filename = f"{_hash_part(part)}{file_ext}"
+            if new_filename in self.assets:
+                return new_filename
+        else:
+            new_filename = f"image_{self.image_counter + 1:03d}{file_ext}"
+
+        self.image_counter += 1
+        return new_filename
+
+    def _save_image_by_hash(self, part: Any, file_ext: str) -> str:
+        """Write an image under its content hash, once per unique blob"""
+        # The blob is hashed in a streaming read-only pass first, so duplicates
+        # (already written by this or an earlier conversion) cost no write at all
+        new_filename = f"{_hash_part(part)}{file_ext}"
+        if new_filename in self._written:
+            return new_filename
+
+        target_dir = self.shared_assets_dir or self.assets_dir
+        if self.shared_assets_dir:
+            os.makedirs(self.shared_assets_dir, exist_ok=True)
+        target_path = os.path.join(target_dir, new_filename)
+        if not os.path.exists(target_path):
+            # Streamed to a temporary file next to its final location, so the blob
+            # is never held in memory as a whole
+            temp_path = _copy_to_temp(part, target_dir)
+            try:
+                os.replace(temp_path, target_path)
+            except OSError:
+                _remove_quietly(temp_path)
+                raise
+
+        self._written.add(new_filename)
+        self.image_counter += 1
+
+        if not self.shared_assets_dir:
+            return new_filename
+
+        shared_path = target_path
+
+        if self.shared_assets_mode == 'hardlink':
+            output_path = os.path.join(self.assets_dir, new_filename)
+            if not os.path.exists(output_path):
+                try:
+                    os.link(shared_path, output_path)
+                except OSError:
+                    # Hardlinks unsupported (e.g. across devices): fall back to a copy
+                    shutil.copyfile(shared_path, output_path)
+
+        return new_filename
+
+    def _image_path(self, image_filename: str) -> str:
+        """Path of an image as referenced from the Markdown file"""
+        if self.shared_assets_dir and self.shared_assets_mode == 'relative':
+            markdown_dir = os.path.dirname(os.path.abspath(self.assets_dir))
+            shared_path = os.path.join(
+                os.path.abspath(self.shared_assets_dir), image_filename)
+            return os.path.relpath(shared_path, markdown_dir).replace(os.sep, '/')
+        return f"./assets/{image_filename}"
 
     def get_image_reference(self, rel_id: Optional[str] = None) -> str:
         """
@@ -109,9 +257,19 @@ class ImageExtractor:
         Returns:
             Markdown image reference string
         """
+        if rel_id and rel_id in self._pending:
+            self._materialize(rel_id)
+
         if rel_id and rel_id in self.image_map:
             image_filename = self.image_map[rel_id]
-            return f"![Image](./assets/{image_filename})"
+            return f"![Image]({self._image_path(image_filename)})"
+        elif rel_id and rel_id in self.external_images:
+            return f"![Image]({self.external_images[rel_id]})"
+        elif (self.lazy or self.hash_names) and self.has_images():
+            # Use the first image as generic reference, writing it if needed
+            image_filename = self._first_image or self._materialize(
+                next(iter(self._pending)))
+            return f"![Image]({self._image_path(image_filename)})"
         elif self.image_counter > 0:
             # Use generic image reference
             image_filename = f"image_001.png"
@@ -120,5 +278,46 @@ class ImageExtractor:
             return ""
 
     def has_images(self) -> bool:
-        """Check if any images were extracted"""
-        return self.image_counter > 0
+        """Check if any images were extracted (or are available for lazy extraction)"""
+        return self.image_counter > 0 or bool(self._pending)
+
+
+def _open_part(part: Any) -> IO[bytes]:
+    """Open an image part as a stream: lazy zip members directly, loaded parts from their blob"""
+    if hasattr(part, 'open'):
+        return part.open()
+    return io.BytesIO(part.blob)
+
+
+def _hash_part(part: Any) -> str:
+    """Content hash of a part, read as a stream"""
+    digest = hashlib.sha256()
+    with _open_part(part) as source:
+        for chunk in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def _copy_to_temp(part: Any, directory: str) -> str:
+    """
+    Stream a part into a temporary file in directory
+
+    The file is renamed into place by the caller, so concurrent writers never see
+    partial files.
+    """
+    temp_path = os.path.join(
+        directory, f".{os.getpid()}.{uuid.uuid4().hex}.tmp")
+    try:
+        with _open_part(part) as source, open(temp_path, 'wb') as temp_file:
+            shutil.copyfileobj(source, temp_file, 1024 * 1024)
+    except Exception:
+        _remove_quietly(temp_path)
+        raise
+    return temp_path
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,111 @@
+"""
+Streaming conversion engine that reads word/document.xml with lxml iterparse.
+
+Unlike the default engine, the python-docx object model of the whole document is
+never built: each top-level paragraph or table is rendered as soon as its end tag
+is parsed and is freed right after, so memory is bounded by the largest single
+block instead of the whole document.
+"""
+
+from typing import Any, Iterator
+
+from .document_processor import DocumentProcessor
+from .document_scanner import DocumentScan, collect_paragraph_facts
+from .numbering_index import NumberingIndex
+from .package import RT_NUMBERING, RT_STYLES, ZipPackage
+from .style_index import StyleIndex
+
+try:
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+    from lxml import etree
+except ImportError:
+    print("Error: Missing required library. Please run: pip install python-docx")
+    import sys
+    sys.exit(1)
+
+try:
+    from docx.oxml.parser import element_class_lookup
+except ImportError:  # python-docx < 1.0
+    from docx.oxml import element_class_lookup
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_BODY = f'{W_NS}body'
+W_P = f'{W_NS}p'
+W_TBL = f'{W_NS}tbl'
+
+
+def iter_body_blocks(package: ZipPackage, document_member: str) -> Iterator[Any]:
+    """
+    Yield each top-level <w:p>/<w:tbl> of the body once it is completely parsed
+
+    Elements use python-docx's element classes, so the regular proxies and
+    processors work on them. A block and everything before it is cleared as
+    soon as the consumer moves on to the next one.
+    """
+    with package.open(document_member) as f:
+        context = etree.iterparse(f, events=('end',), tag=(W_P, W_TBL))
+        context.set_element_class_lookup(element_class_lookup)
+
+        for _, element in context:
+            parent = element.getparent()
+            if parent is None or parent.tag != W_BODY:
+                # Nested paragraph/table, rendered as part of its top-level block
+                continue
+
+            yield element
+
+            # Free the processed block and any skipped siblings before it
+            element.clear()
+            while element.getprevious() is not None:
+                del parent[0]
+
+
+def load_style_index(package: ZipPackage, document_member: str) -> StyleIndex:
+    """Build the style index from the package's styles part"""
+    styles_member = package.related_member(document_member, RT_STYLES)
+    if not styles_member:
+        return StyleIndex()
+    return StyleIndex(package.parse_xml(styles_member))
+
+
+def load_numbering_index(package: ZipPackage, document_member: str,
+                          style_index: StyleIndex) -> NumberingIndex:
+    """Build the numbering index from the package's numbering part"""
+    numbering_member = package.related_member(document_member, RT_NUMBERING)
+    if not numbering_member or not package.has_member(numbering_member):
+        return NumberingIndex()
+    return NumberingIndex(package.parse_xml(numbering_member), style_index)
+
+
+def convert_package_streaming(package: ZipPackage, document_processor: DocumentProcessor) -> None:
+    """Convert the main document of a package block by block"""
+    stats = document_processor.stats
+    document_member = package.main_document_member()
+    text_only = document_processor.text_only
+
+    # First pass: only document-level decisions (title, heading styles, font sizes)
+    with stats.stage('scan'):
+        style_index = load_style_index(package, document_member)
+        numbering = load_numbering_index(package, document_member, style_index)
+        link_targets = {} if text_only else {
+            rel_id: rel.target_ref
+            for rel_id, rel in package.relationships(document_member).items()}
+
+        scan = DocumentScan(keep_blocks=False)
+        for element in iter_body_blocks(package, document_member):
+            if element.tag == W_P:
+                scan.add_paragraph(collect_paragraph_facts(
+                    Paragraph(element, None), style_index, text_only))
+
+        document_processor.begin_document(style_index, link_targets, scan, numbering)
+
+    # Second pass: render each block as soon as it is complete
+    with stats.stage('render'):
+        for element in iter_body_blocks(package, document_member):
+            if element.tag == W_P:
+                block = collect_paragraph_facts(
+                    Paragraph(element, None), style_index, text_only)
+            else:
+                block = Table(element, None)
+            document_processor.convert_block(block)
@@ -0,0 +1,234 @@
+"""
+LibreOffice helpers for converting legacy .doc files to .docx.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _build_soffice_command(soffice_path: str, out_dir: str, input_paths: List[str],
+                           profile_dir: Optional[str] = None) -> List[str]:
+    """Build a headless soffice command converting input_paths into out_dir"""
+    cmd = [soffice_path]
+    if profile_dir:
+        # An isolated user profile lets several soffice processes run side by side
+        cmd.append(
+            f"-env:UserInstallation={Path(profile_dir).resolve().as_uri()}")
+    cmd += [
+        '--headless',
+        '--nologo',
+        '--nofirststartwizard',
+        '--convert-to',
+        'docx',
+        '--outdir',
+        out_dir,
+    ]
+    cmd += input_paths
+    return cmd
+
+
+def convert_doc_to_docx(input_doc_path: str, out_dir: str, profile_dir: Optional[str] = None) -> str:
+    """Convert a legacy .doc file to .docx using LibreOffice/soffice.
+
+    Returns the converted .docx path.
+    """
+    soffice_path = find_soffice_executable()
+
+    # LibreOffice writes the output docx into out_dir, keeping the base name.
+    cmd = _build_soffice_command(
+        soffice_path, out_dir, [input_doc_path], profile_dir)
+
+    logger.info(
+        f"Converting .doc to .docx via LibreOffice: {input_doc_path}")
+    try:
+        subprocess.run(cmd, check=True, stdout=subprocess.PIPE,
+                       stderr=subprocess.PIPE)
+    except FileNotFoundError as e:
+        raise RuntimeError(
+            "LibreOffice (soffice) not found. Install LibreOffice to convert .doc files. "
+            "On macOS: brew install --cask libreoffice"
+        ) from e
+    except subprocess.CalledProcessError as e:
+        stderr = (e.stderr or b'').decode('utf-8', errors='replace')
+        raise RuntimeError(
+            f"Failed to convert .doc to .docx using LibreOffice. Details: {stderr.strip()}"
+        ) from e
+
+    expected = os.path.join(out_dir, f"{Path(input_doc_path).stem}.docx")
+    if os.path.exists(expected):
+        return expected
+
+    # Fallback: find any produced .docx
+    candidates = [p for p in Path(out_dir).glob('*.docx') if p.is_file()]
+    if len(candidates) == 1:
+        return str(candidates[0])
+    if candidates:
+        # If multiple, pick the newest
+        newest = max(candidates, key=lambda p: p.stat().st_mtime)
+        return str(newest)
+
+    raise RuntimeError(
+        "LibreOffice reported success but no .docx was produced.")
+
+
+def convert_docs_to_docx_batch(doc_paths: List[str], work_dir: str, chunk_size: int = 20,
+                               jobs: int = 1) -> Dict[str, str]:
+    """Convert many .doc files with one soffice invocation per chunk.
+
+    Chunks run in parallel (up to `jobs` at a time), each with its own output
+    directory and isolated LibreOffice profile under work_dir.
+
+    Returns a mapping of .doc path to converted .docx path. Files LibreOffice
+    failed to convert are missing from the mapping.
+    """
+    soffice_path = find_soffice_executable()
+    chunks = _make_chunks(doc_paths, max(1, chunk_size))
+
+    def convert_chunk(index: int, chunk: List[str]) -> Dict[str, str]:
+        out_dir = os.path.join(work_dir, f"chunk_{index:04d}")
+        profile_dir = os.path.join(work_dir, f"profile_{index:04d}")
+        os.makedirs(out_dir, exist_ok=True)
+
+        cmd = _build_soffice_command(soffice_path, out_dir, chunk, profile_dir)
+        logger.info(
+            f"Converting {len(chunk)} .doc files to .docx via LibreOffice (chunk {index + 1}/{len(chunks)})")
+        try:
+            subprocess.run(cmd, check=True, stdout=subprocess.PIPE,
+                           stderr=subprocess.PIPE)
+        except FileNotFoundError as e:
+            raise RuntimeError(
+                "LibreOffice (soffice) not found. Install LibreOffice to convert .doc files. "
+                "On macOS: brew install --cask libreoffice"
+            ) from e
+        except subprocess.CalledProcessError as e:
+            # Some files of the chunk may still have been converted
+            stderr = (e.stderr or b'').decode('utf-8', errors='replace')
+            logger.warning(
+                f"LibreOffice reported an error for chunk {index + 1}: {stderr.strip()}")
+        finally:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+        converted = {}
+        for doc_path in chunk:
+            expected = os.path.join(out_dir, f"{Path(doc_path).stem}.docx")
+            if os.path.exists(expected):
+                converted[doc_path] = expected
+            else:
+                logger.warning(
+                    f"LibreOffice produced no .docx for: {doc_path}")
+        return converted
+
+    results: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = [executor.submit(convert_chunk, index, chunk)
+                   for index, chunk in enumerate(chunks)]
+        for future in futures:
+            results.update(future.result())
+    return results
+
+
+def _make_chunks(doc_paths: List[str], chunk_size: int) -> List[List[str]]:
+    """Split paths into chunks whose file stems are unique (LibreOffice names output by stem)"""
+    # The n-th file with a given stem goes into the n-th round of chunks
+    stem_counts: Dict[str, int] = {}
+    rounds: List[List[str]] = []
+    for doc_path in doc_paths:
+        stem = Path(doc_path).stem.lower()
+        occurrence = stem_counts.get(stem, 0)
+        stem_counts[stem] = occurrence + 1
+        if occurrence == len(rounds):
+            rounds.append([])
+        rounds[occurrence].append(doc_path)
+
+    return [paths[i:i + chunk_size]
+            for paths in rounds
+            for i in range(0, len(paths), chunk_size)]
+
+
+def find_soffice_executable() -> str:
+    """Locate LibreOffice command for headless conversion across OSes.
+
+    Order of checks:
+    1. Environment variable `WORD2MD_SOFFICE_PATH`
+    2. Common executable names on PATH: `soffice`, `libreoffice`
+    3. Known installation paths per-platform (macOS, Windows, common Linux locations)
+    4. Flatpak/exported paths
+    Raises a RuntimeError with helpful instructions if not found.
+    """
+    import platform
+
+    # 1) Allow explicit override via environment variable
+    env_path = os.environ.get('DOCX2MD_SOFFICE_PATH') or os.environ.get(
+        'WORD2MD_SOFFICE_PATH') or os.environ.get('SOFFICE_PATH')
+    if env_path:
+        if os.path.exists(env_path) and os.access(env_path, os.X_OK):
+            return env_path
+        else:
+            raise RuntimeError(
+                f"Environment variable set to '{env_path}' but file is not executable or doesn't exist. Set DOCX2MD_SOFFICE_PATH or WORD2MD_SOFFICE_PATH to a valid soffice path.")
+
+    # 2) Common executable names on PATH
+    for name in ('soffice', 'libreoffice'):
+        found = shutil.which(name)
+        if found:
+            return found
+
+    system = platform.system()
+
+    # 3) Platform-specific likely locations
+    candidates = []
+
+    if system == 'Darwin':  # macOS
+        candidates += [
+            '/Applications/LibreOffice.app/Contents/MacOS/soffice',
+            '/Applications/LibreOffice.app/Contents/MacOS/soffice.bin',
+            '/usr/local/bin/soffice',
+            '/opt/homebrew/bin/soffice',
+            '/opt/local/bin/soffice',
+        ]
+    elif system == 'Windows':  # Windows
+        program_files = os.environ.get('ProgramFiles', r'C:\Program Files')
+        program_files_x86 = os.environ.get(
+            'ProgramFiles(x86)', r'C:\Program Files (x86)')
+        candidates += [
+            os.path.join(program_files, 'LibreOffice',
+                         'program', 'soffice.exe'),
+            os.path.join(program_files_x86, 'LibreOffice',
+                         'program', 'soffice.exe'),
+        ]
+    else:  # Linux / other Unix
+        candidates += [
+            '/usr/bin/libreoffice',
+            '/usr/bin/soffice',
+            '/usr/local/bin/libreoffice',
+            '/usr/local/bin/soffice',
+            '/snap/bin/libreoffice',
+        ]
+
+    # 4) Check flatpak / exported locations
+    candidates += [
+        '/var/lib/flatpak/exports/bin/libreoffice',
+        '/var/lib/flatpak/exports/bin/soffice',
+    ]
+
+    # Verify candidate paths
+    for p in candidates:
+        if p and os.path.exists(p) and os.access(p, os.X_OK):
+            return p
+
+    # Nothing found — provide a helpful error message
+    hint_lines = [
+        'LibreOffice (soffice) not found on this system.',
+        'To enable .doc support the converter needs LibreOffice for .doc → .docx conversion.',
+        'Options:',
+        "  * Install LibreOffice and ensure `soffice` is on PATH (macOS: `brew install --cask libreoffice`).",
+        "  * Set the environment variable `WORD2MD_SOFFICE_PATH` to the soffice executable path.",
+    ]
+    raise RuntimeError('\n'.join(hint_lines))
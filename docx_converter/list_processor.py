@@ -2,47 +2,51 @@
 List processing module for handling ordered and unordered lists.
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 
+from .document_scanner import ParagraphFacts
+from .markdown_writer import MarkdownWriter
+from .numbering_index import NumberingCounter, NumberingIndex, NumberingLevel
 from .utils import (is_list_marker_text, is_numbered_list_text,
                     remove_list_markers)
 
-try:
-    from docx.text.paragraph import Paragraph
-except ImportError:
-    print("Error: Missing required library. Please run: pip install python-docx")
-    import sys
-    sys.exit(1)
-
 
 class ListProcessor:
     """Handles list processing and conversion"""
 
-    def __init__(self, output_lines: List[str], text_formatter):
+    def __init__(self, output_lines: MarkdownWriter, text_formatter):
         self.output_lines = output_lines
         self.text_formatter = text_formatter
         self.current_list_level = 0
         self.list_counters: Dict[int, int] = {}
         self.in_list = False
         self.list_type: Optional[str] = None
+        self.numbering = NumberingIndex()
+        self.numbering_counter = NumberingCounter(self.numbering)
+        # Level -> column where the text of the last numbered item at that level starts
+        self._content_columns: Dict[int, int] = {}
+
+    def set_numbering(self, numbering: NumberingIndex) -> None:
+        """Set the numbering index of the current document and reset its counters"""
+        self.numbering = numbering
+        self.numbering_counter = NumberingCounter(numbering)
 
-    def is_list_paragraph(self, paragraph: Paragraph) -> bool:
+    def is_list_paragraph(self, facts: ParagraphFacts) -> bool:
         """Check if paragraph is a list item"""
-        # Check paragraph numbering format
-        if paragraph._element.pPr is not None:
-            numPr = paragraph._element.pPr.find(
-                './/{http://schemas.openxmlformats.org/wordprocessingml/2006/main}numPr')
-            if numPr is not None:
-                return True
+        # Numbering defined in numbering.xml (directly or through the paragraph style)
+        if self._numbering_level(facts) is not None and 'heading' not in facts.style_name:
+            return True
+
+        # Check paragraph numbering format (numId 0 removes numbering)
+        if facts.has_numpr and facts.num_id != 0:
+            return True
 
         # Check if paragraph style is a list style
-        style_name = paragraph.style.name.lower(
-        ) if paragraph.style and paragraph.style.name else ''
-        if 'list' in style_name or 'bullet' in style_name:
+        if facts.style.is_list:
             return True
 
         # Check if text starts with list markers
-        text = paragraph.text.strip()
+        text = facts.text
         if is_list_marker_text(text):
             return True
 
@@ -52,23 +56,15 @@ class ListProcessor:
 
         return False
 
-    def _get_list_level(self, paragraph: Paragraph) -> int:
+    def _get_list_level(self, facts: ParagraphFacts) -> int:
         """Determine the list level (indentation depth) of a paragraph"""
+        paragraph = facts.paragraph
         try:
-            # Check for numbering format in paragraph properties
-            if paragraph._element.pPr is not None:
-                numPr = paragraph._element.pPr.find(
-                    './/{http://schemas.openxmlformats.org/wordprocessingml/2006/main}numPr')
-                if numPr is not None:
-                    # Try to get the list level from numbering properties
-                    ilvl = numPr.find(
-                        './/{http://schemas.openxmlformats.org/wordprocessingml/2006/main}ilvl')
-                    if ilvl is not None:
-                        level = ilvl.get(
-                            '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}val')
-                        if level is not None:
-                            return int(level)
+            # Use the list level from numbering properties
+            if facts.ilvl is not None:
+                return facts.ilvl
 
+            if paragraph._element.pPr is not None:
                 # Check indentation from paragraph properties
                 ind = paragraph._element.pPr.find(
                     './/{http://schemas.openxmlformats.org/wordprocessingml/2006/main}ind')
@@ -87,7 +83,7 @@ class ListProcessor:
                         return min(level, 5)  # Cap at reasonable level
 
             # Fallback: analyze text for visual markers
-            text = paragraph.text.strip()
+            text = facts.text
             if text.startswith('o\t') or text.startswith('o '):
                 return 1  # Sub-item
             elif text.startswith('▪') or text.startswith('◦'):
@@ -100,16 +96,18 @@ class ListProcessor:
 
         return 0  # Default to top level
 
-    def convert_list_item(self, paragraph: Paragraph) -> None:
+    def convert_list_item(self, facts: ParagraphFacts) -> None:
         """Convert list item"""
-        text = paragraph.text.strip()
+        level = self._numbering_level(facts)
+        if level is not None:
+            self._convert_numbered_item(facts, level)
+            return
 
-        # Check paragraph style
-        style_name = paragraph.style.name.lower(
-        ) if paragraph.style and paragraph.style.name else ''
+        text = facts.text
+        style_name = facts.style_name
 
         # Detect list level from indentation or numbering format
-        list_level = self._get_list_level(paragraph)
+        list_level = self._get_list_level(facts)
 
         # Determine list type
         is_ordered = self._determine_list_type(text, style_name)
@@ -143,13 +141,50 @@ class ListProcessor:
         # Add appropriate indentation based on list level
         indent = '  ' * list_level
         formatted_text = self.text_formatter.convert_paragraph_formatting(
-            paragraph, cleaned_text)
+            facts.paragraph, cleaned_text)
+        self.output_lines.append(f"{indent}{list_marker} {formatted_text}")
+
+    def _numbering_level(self, facts: ParagraphFacts) -> Optional[NumberingLevel]:
+        """Numbering level definition of a paragraph, None if it is not numbered"""
+        if not facts.num_id:
+            return None
+        return self.numbering.level(facts.num_id, facts.ilvl or 0)
+
+    def _convert_numbered_item(self, facts: ParagraphFacts, level: NumberingLevel) -> None:
+        """
+        Convert a list item backed by a numbering definition
+
+        Marker type, start number and nesting come from numbering.xml, and numbers
+        continue across interruptions the way Word counts them. The paragraph text
+        carries no typed marker, so its runs are formatted as they are.
+        """
+        list_level = facts.ilvl or 0
+        current_list_type = 'ordered' if level.is_ordered else 'unordered'
+        if not self.in_list or self.list_type != current_list_type:
+            self.in_list = True
+            self.list_type = current_list_type
+        self.current_list_level = list_level
+
+        # Every item advances the counters, bullets included, so deeper levels restart
+        number = self.numbering_counter.next_number(facts.num_id, list_level)
+        list_marker = f"{number}." if level.is_ordered else '-'
+
+        # Nest under the text of the parent item, so "10. " children are indented by 4
+        parent_column = self._content_columns.get(list_level - 1)
+        indent_width = parent_column if parent_column is not None else 2 * list_level
+        for deeper in [deeper for deeper in self._content_columns if deeper >= list_level]:
+            del self._content_columns[deeper]
+        self._content_columns[list_level] = indent_width + len(list_marker) + 1
+
+        indent = ' ' * indent_width
+        formatted_text = self.text_formatter.convert_facts(facts)
         self.output_lines.append(f"{indent}{list_marker} {formatted_text}")
 
     def end_list(self) -> None:
         """End current list"""
         self.in_list = False
         self.list_type = None
+        self._content_columns = {}
 
     def _determine_list_type(self, text: str, style_name: str) -> bool:
         """Determine if list is ordered or unordered"""
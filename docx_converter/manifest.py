@@ -0,0 +1,195 @@
+"""
+Manifest of converted inputs for incremental batch conversion.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import uuid
+from typing import Any, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = '.word2md-manifest.json'
+MANIFEST_FORMAT = 1
+# Recorded conversions between two automatic saves
+SAVE_INTERVAL = 100
+
+
+class ConversionManifest:
+    """
+    Record of every input converted into an output directory
+
+    Each entry keeps the input's size, modification time and content hash next to
+    the Markdown and image files it produced. Changes are written every
+    SAVE_INTERVAL recorded files and by flush() at the end of a run (also when
+    it is interrupted), so a batch costs a bounded number of manifest writes and
+    an aborted batch resumes close to where it stopped. An entry is only trusted when it was produced with the same converter version and options
+    (the fingerprint).
+    """
+
+    def __init__(self, output_root: str, fingerprint: str):
+        """
+        Args:
+            output_root: Output directory the manifest is stored in
+            fingerprint: Converter version and output-affecting options
+        """
+        self.output_root = output_root
+        self.path = os.path.join(output_root, MANIFEST_NAME)
+        self.fingerprint = fingerprint
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Changes not written yet, and conversions recorded since the last save
+        self._dirty = False
+        self._unsaved_records = 0
+        self._load()
+
+    def is_up_to_date(self, input_path: str, output_path: str) -> bool:
+        """Check whether input_path was converted to output_path and is unchanged since"""
+        entry = self.entries.get(self._key(input_path))
+        if entry is None or entry.get('fingerprint') != self.fingerprint:
+            return False
+        if entry.get('output') != self._relative(output_path):
+            return False
+        if not os.path.exists(output_path):
+            return False
+
+        try:
+            stat = os.stat(input_path)
+        except OSError:
+            return False
+        if stat.st_size != entry.get('size'):
+            return False
+        if stat.st_mtime_ns == entry.get('mtime_ns'):
+            return True
+
+        # Touched but maybe not modified: compare content
+        if _file_sha256(input_path) != entry.get('sha256'):
+            return False
+        entry['mtime_ns'] = stat.st_mtime_ns
+        self._dirty = True
+        return True
+
+    def record(self, input_path: str, output_path: str, asset_paths: Iterable[str]) -> None:
+        """Record a successful conversion, saving the manifest every SAVE_INTERVAL records"""
+        stat = os.stat(input_path)
+        self.entries[self._key(input_path)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': _file_sha256(input_path),
+            'output': self._relative(output_path),
+            'assets': sorted(self._relative(path) for path in asset_paths),
+            'fingerprint': self.fingerprint,
+        }
+        self._dirty = True
+        self._unsaved_records += 1
+        if self._unsaved_records >= SAVE_INTERVAL:
+            self.save()
+
+    def remove_vanished(self, input_paths: Iterable[str]) -> List[str]:
+        """
+        Delete the outputs of recorded inputs that no longer exist
+
+        Image files still used by a remaining entry are kept.
+
+        Returns:
+            List of input paths whose outputs were removed
+        """
+        current = {self._key(path) for path in input_paths}
+        vanished = [key for key in self.entries
+                    if key not in current and not os.path.exists(key)]
+        if not vanished:
+            return []
+
+        removed = [self.entries.pop(key) for key in vanished]
+
+        # Files of the remaining entries, collected once
+        still_used = {asset for other in self.entries.values()
+                      for asset in other.get('assets', [])}
+        still_used.update(other.get('output') for other in self.entries.values())
+
+        for entry in removed:
+            for relative_path in [entry.get('output')] + entry.get('assets', []):
+                if not relative_path or relative_path in still_used:
+                    continue
+                path = os.path.join(self.output_root, relative_path)
+                try:
+                    os.remove(path)
+                    logger.info(f"Removed output of vanished input: {path}")
+                except OSError:
+                    pass
+                _remove_empty_dir(os.path.dirname(path), self.output_root)
+
+        self.save()
+        return vanished
+
+    def flush(self) -> None:
+        """Write pending changes, if any"""
+        if self._dirty:
+            self.save()
+
+    def save(self) -> None:
+        """Write the manifest atomically"""
+        os.makedirs(self.output_root, exist_ok=True)
+        data = {
+            'format': MANIFEST_FORMAT,
+            'entries': self.entries,
+        }
+        temp_path = f"{self.path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+            self._dirty = False
+            self._unsaved_records = 0
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+            return
+
+        if data.get('format') != MANIFEST_FORMAT:
+            return
+        self.entries = data.get('entries') or {}
+
+    def _key(self, input_path: str) -> str:
+        return os.path.abspath(input_path)
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.output_root).replace(os.sep, '/')
+
+
+def make_fingerprint(version: str, options: Dict[str, Any]) -> str:
+    """Fingerprint of the converter version and the options that affect its output"""
+    data = json.dumps({'version': version, 'options': options}, sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _remove_empty_dir(directory: str, stop_at: str) -> None:
+    """Remove directory if it is empty, but never the output root itself"""
+    if os.path.abspath(directory) == os.path.abspath(stop_at):
+        return
+    try:
+        if not os.listdir(directory):
+            os.rmdir(directory)
+    except OSError:
+        pass
@@ -0,0 +1,249 @@
+"""
+Streaming Markdown writer that cleans output incrementally.
+"""
+
+import re
+from typing import Iterable, List, Optional, TextIO, Tuple
+
+from .profiling import ConversionStats
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+)$')
+BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+CJK_TRAILING_PUNCTUATION = re.compile(r'[。！？：；，]+$')
+TRAILING_PUNCTUATION = re.compile(r'[:\.]+$')
+ADJACENT_UNDERLINE_PATTERN = re.compile(r'</u><u>')
+
+
+def clean_heading_text(text: str) -> str:
+    """Remove trailing punctuation from heading text"""
+    # Remove trailing punctuation like 。！？：；，
+    text = CJK_TRAILING_PUNCTUATION.sub('', text.strip())
+
+    # Also remove trailing colons and periods in English
+    text = TRAILING_PUNCTUATION.sub('', text.strip())
+
+    return text.strip()
+
+
+class CleanupStage:
+    """
+    One rule of the writer's cleanup chain
+
+    The scope decides what a stage sees: 'formatted' stages get the inline
+    Markdown of each paragraph as TextFormatter renders it (paragraph text, list
+    items, table cells), 'line' stages get every appended line, 'heading' stages
+    get the level and text of heading lines (matched once for all of them), and
+    'output' stages get the text as it is written, with runs of lines joined and
+    the document's leading/trailing whitespace removed.
+    """
+
+    name = ''
+    scope = 'line'
+
+    def reset(self) -> None:
+        """Forget the state kept from previous lines"""
+
+    def apply(self, text: str) -> str:
+        """Transform formatted text, a line or written text ('formatted', 'line', 'output' scope)"""
+        return text
+
+    def apply_heading(self, level: int, text: str) -> Tuple[int, str]:
+        """Transform the level and text of a heading ('heading' scope)"""
+        return level, text
+
+
+class MergeTagsStage(CleanupStage):
+    """Merge adjacent HTML tags of the same type (<u>a</u><u>b</u> → <u>ab</u>)"""
+
+    name = 'merge_tags'
+    # Only formatter output: headings, table syntax and image lines are left alone
+    scope = 'formatted'
+
+    def apply(self, text: str) -> str:
+        if '</u><u>' not in text:
+            return text
+        return ADJACENT_UNDERLINE_PATTERN.sub('', text)
+
+
+class HeadingLevelStage(CleanupStage):
+    """Fix heading level jumps (MD001): a heading is at most one level below the previous"""
+
+    name = 'heading_levels'
+    scope = 'heading'
+
+    def __init__(self):
+        self._last_heading_level = 0
+
+    def reset(self) -> None:
+        self._last_heading_level = 0
+
+    def apply_heading(self, level: int, text: str) -> Tuple[int, str]:
+        if self._last_heading_level > 0:  # Not the first heading
+            # Reduce level to avoid jumping
+            level = min(level, self._last_heading_level + 1)
+        self._last_heading_level = level
+        return level, text
+
+
+class HeadingPunctuationStage(CleanupStage):
+    """Remove trailing punctuation from headings"""
+
+    name = 'heading_punctuation'
+    scope = 'heading'
+
+    def apply_heading(self, level: int, text: str) -> Tuple[int, str]:
+        return level, clean_heading_text(text)
+
+
+class BlankLinesStage(CleanupStage):
+    """Collapse runs of blank lines into one"""
+
+    name = 'collapse_blank_lines'
+    scope = 'output'
+
+    def apply(self, text: str) -> str:
+        if '\n\n\n' not in text:
+            return text
+        return BLANK_LINES_PATTERN.sub('\n\n', text)
+
+
+# Built-in stages in the order they run
+STAGE_TYPES = (MergeTagsStage, HeadingLevelStage, HeadingPunctuationStage, BlankLinesStage)
+STAGE_NAMES = tuple(stage_type.name for stage_type in STAGE_TYPES)
+
+
+def create_stages(disabled: Iterable[str] = ()) -> List[CleanupStage]:
+    """
+    Create the built-in cleanup stages
+
+    Args:
+        disabled: Names of stages to leave out (see STAGE_NAMES)
+
+    Returns:
+        Fresh stage instances, in order
+    """
+    disabled = set(disabled)
+    unknown = disabled - set(STAGE_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown cleanup stages: {', '.join(sorted(unknown))}")
+    return [stage_type() for stage_type in STAGE_TYPES if stage_type.name not in disabled]
+
+
+class MarkdownWriter:
+    """
+    Sink for Markdown lines produced by the processors
+
+    Lines are cleaned as they arrive and written to the stream right away, by a
+    single pass through a chain of cleanup stages (by default: adjacent tags are
+    merged, heading level jumps are fixed, trailing punctuation is removed from
+    headings and runs of blank lines are collapsed). Leading/trailing whitespace
+    of the document is always dropped. The result is identical to joining all
+    lines, post-processing the whole text and writing it at once, while memory
+    use stays flat regardless of document size.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, keep_content: bool = True,
+                 stats: Optional[ConversionStats] = None,
+                 stages: Optional[List[CleanupStage]] = None):
+        """
+        Args:
+            stream: Text stream the cleaned Markdown is written to (optional)
+            keep_content: Also keep the cleaned Markdown in memory for getvalue()
+            stats: Conversion stats to charge cleanup and writing time to ('write')
+            stages: Cleanup chain (default: all built-in stages, see create_stages)
+        """
+        self.stream = stream
+        self.stats = stats
+        self.keep_content = keep_content
+        self.last_line: Optional[str] = None
+        self.stages = create_stages() if stages is None else stages
+        for stage in self.stages:
+            stage.reset()
+        self._formatted_stages = [stage for stage in self.stages if stage.scope == 'formatted']
+        self._line_stages = [stage for stage in self.stages if stage.scope == 'line']
+        self._heading_stages = [stage for stage in self.stages if stage.scope == 'heading']
+        self._output_stages = [stage for stage in self.stages if stage.scope == 'output']
+        self._chunks: List[str] = []
+        self._started = False
+        self._held_whitespace = ''
+        self._closed = False
+
+    def append(self, line: str) -> None:
+        """Add one Markdown line (may contain embedded newlines)"""
+        if self.stats:
+            self.stats.enter('write')
+        piece = self._clean_line(line)
+        if self.last_line is not None:
+            piece = '\n' + piece
+        self.last_line = line
+        self._feed(piece)
+        if self.stats:
+            self.stats.exit()
+
+    def close(self) -> None:
+        """Finish the document with a single trailing newline"""
+        if not self._closed:
+            self._closed = True
+            self._held_whitespace = ''
+            self._emit('\n')
+
+    def getvalue(self) -> str:
+        """Get the cleaned Markdown written so far (requires keep_content)"""
+        return ''.join(self._chunks)
+
+    def clean_formatted(self, text: str) -> str:
+        """
+        Run inline Markdown rendered by TextFormatter through the 'formatted' stages
+
+        Args:
+            text: Formatted text of one paragraph
+
+        Returns:
+            Cleaned text
+        """
+        for stage in self._formatted_stages:
+            text = stage.apply(text)
+        return text
+
+    def _clean_line(self, line: str) -> str:
+        """Run a line through the line stages, then headings through the heading stages"""
+        for stage in self._line_stages:
+            line = stage.apply(line)
+
+        if not self._heading_stages or not line.startswith('#'):
+            return line
+        heading_match = HEADING_PATTERN.match(line)
+        if not heading_match:
+            return line
+
+        level = len(heading_match.group(1))
+        text = heading_match.group(2)
+        for stage in self._heading_stages:
+            level, text = stage.apply_heading(level, text)
+        return f"{'#' * level} {text}"
+
+    def _feed(self, piece: str) -> None:
+        """Collapse blank lines and strip the document while streaming"""
+        # Whitespace at the end is held back until more text arrives, so it can be
+        # dropped at the end of the document and collapsed as a whole otherwise
+        text = self._held_whitespace + piece
+        body = text.rstrip()
+        self._held_whitespace = text[len(body):]
+
+        if not self._started:
+            body = body.lstrip()
+            if not body:
+                self._held_whitespace = ''
+                return
+            self._started = True
+
+        if body:
+            for stage in self._output_stages:
+                body = stage.apply(body)
+            self._emit(body)
+
+    def _emit(self, text: str) -> None:
+        if self.stream is not None:
+            self.stream.write(text)
+        if self.keep_content:
+            self._chunks.append(text)
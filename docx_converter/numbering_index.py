@@ -0,0 +1,188 @@
+"""
+Numbering index module for resolving list numbering definitions from numbering.xml.
+"""
+
+from typing import Any, Dict, Optional, Set
+
+from .package import PackageDocument
+from .style_index import StyleIndex, W_NS
+
+# Number formats rendered as unordered list items
+UNORDERED_FORMATS = ('bullet', 'none')
+
+
+class NumberingLevel:
+    """Definition of one level (<w:lvl>) of a numbering definition"""
+
+    __slots__ = ('num_fmt', 'start', 'lvl_text', 'restart')
+
+    def __init__(self, num_fmt: str = 'decimal', start: int = 0, lvl_text: str = '',
+                 restart: Optional[int] = None):
+        self.num_fmt = num_fmt
+        self.start = start
+        self.lvl_text = lvl_text
+        # One-based level whose use restarts this level (0 = never, None = any
+        # higher level)
+        self.restart = restart
+
+    @property
+    def is_ordered(self) -> bool:
+        return self.num_fmt not in UNORDERED_FORMATS
+
+
+class NumberingIndex:
+    """Per-document index of numbering definitions built once from numbering.xml"""
+
+    def __init__(self, numbering_element: Any = None, style_index: Optional[StyleIndex] = None):
+        """
+        Args:
+            numbering_element: <w:numbering> root element, or None for no numbering
+            style_index: Styles of the document, used to follow numbering style links
+        """
+        # numId -> ilvl -> level, with level overrides applied
+        self.levels: Dict[int, Dict[int, NumberingLevel]] = {}
+        # numId -> key of the counters it shares
+        self.counter_keys: Dict[int, str] = {}
+
+        if numbering_element is not None:
+            self._build(numbering_element, style_index or StyleIndex())
+
+    @classmethod
+    def from_document(cls, doc: Any, style_index: Optional[StyleIndex] = None) -> 'NumberingIndex':
+        """Build the index from a python-docx Document (or PackageDocument)"""
+        try:
+            if isinstance(doc, PackageDocument):
+                part = doc.numbering
+            else:
+                part = doc.part.numbering_part
+            return cls(part.element if part is not None else None, style_index)
+        except (AttributeError, KeyError, NotImplementedError):
+            return cls()
+
+    def level(self, num_id: int, ilvl: int) -> Optional[NumberingLevel]:
+        """Look up the level ilvl of numbering instance num_id"""
+        levels = self.levels.get(num_id)
+        return levels.get(ilvl) if levels else None
+
+    def _build(self, numbering_element: Any, style_index: StyleIndex) -> None:
+        """Parse abstract definitions and numbering instances once"""
+        abstract_levels: Dict[str, Dict[int, NumberingLevel]] = {}
+        style_links: Dict[str, str] = {}
+        for abstract in numbering_element.iterchildren(f'{W_NS}abstractNum'):
+            abstract_id = abstract.get(f'{W_NS}abstractNumId')
+            abstract_levels[abstract_id] = {
+                ilvl: level for ilvl, level in map(
+                    _parse_level, abstract.iterchildren(f'{W_NS}lvl')) if ilvl is not None}
+            link = abstract.find(f'{W_NS}numStyleLink')
+            if link is not None:
+                style_links[abstract_id] = link.get(f'{W_NS}val')
+
+        num_abstracts: Dict[int, str] = {}
+        nums = []
+        for num in numbering_element.iterchildren(f'{W_NS}num'):
+            num_id = _int(num.get(f'{W_NS}numId'))
+            abstract_ref = num.find(f'{W_NS}abstractNumId')
+            if num_id is None or abstract_ref is None:
+                continue
+            num_abstracts[num_id] = abstract_ref.get(f'{W_NS}val')
+            nums.append((num_id, num))
+
+        for num_id, num in nums:
+            abstract_id = self._follow_style_links(
+                num_abstracts[num_id], style_links, num_abstracts, style_index)
+            levels = dict(abstract_levels.get(abstract_id, {}))
+
+            # Instances of the same abstract definition continue each other's
+            # numbering unless they restart it
+            counter_key = f'abstract:{abstract_id}'
+            for override in num.iterchildren(f'{W_NS}lvlOverride'):
+                ilvl = _int(override.get(f'{W_NS}ilvl'))
+                if ilvl is None:
+                    continue
+                lvl = override.find(f'{W_NS}lvl')
+                if lvl is not None:
+                    levels[ilvl] = _parse_level(lvl)[1]
+                start_override = override.find(f'{W_NS}startOverride')
+                if start_override is not None:
+                    level = levels.get(ilvl) or NumberingLevel()
+                    levels[ilvl] = NumberingLevel(
+                        level.num_fmt, _int(start_override.get(f'{W_NS}val')) or 0,
+                        level.lvl_text, level.restart)
+                    counter_key = f'num:{num_id}'
+
+            self.levels[num_id] = levels
+            self.counter_keys[num_id] = counter_key
+
+    def _follow_style_links(self, abstract_id: str, style_links: Dict[str, str],
+                            num_abstracts: Dict[int, str], style_index: StyleIndex) -> str:
+        """Resolve an abstract definition that only links to a numbering style"""
+        seen: Set[str] = set()
+        while abstract_id in style_links and abstract_id not in seen:
+            seen.add(abstract_id)
+            style = style_index.styles.get(style_links[abstract_id])
+            if style is None or style.num_id not in num_abstracts:
+                break
+            abstract_id = num_abstracts[style.num_id]
+        return abstract_id
+
+
+class NumberingCounter:
+    """Running item numbers of a document's numbering instances"""
+
+    def __init__(self, numbering: NumberingIndex):
+        self.numbering = numbering
+        # Counter key -> ilvl -> number of the last item
+        self._counts: Dict[str, Dict[int, int]] = {}
+
+    def next_number(self, num_id: int, ilvl: int) -> int:
+        """
+        Advance the counter of a list item and return its number
+
+        Using a level restarts the deeper levels that restart after it.
+
+        Args:
+            num_id: Numbering instance of the item
+            ilvl: Level of the item
+
+        Returns:
+            Item number
+        """
+        levels = self.numbering.levels.get(num_id, {})
+        counts = self._counts.setdefault(
+            self.numbering.counter_keys.get(num_id, f'num:{num_id}'), {})
+
+        level = levels.get(ilvl)
+        number = counts[ilvl] + 1 if ilvl in counts else (level.start if level else 1)
+        counts[ilvl] = number
+
+        for deeper in [deeper for deeper in counts if deeper > ilvl]:
+            deeper_level = levels.get(deeper)
+            restart = deeper_level.restart if deeper_level else None
+            if restart is None:
+                restart = deeper
+            if restart and ilvl < restart:
+                del counts[deeper]
+
+        return number
+
+
+def _parse_level(lvl: Any):
+    """Parse a <w:lvl> element into (ilvl, NumberingLevel)"""
+    ilvl = _int(lvl.get(f'{W_NS}ilvl'))
+    num_fmt = _child_val(lvl, 'numFmt') or 'decimal'
+    start = _int(_child_val(lvl, 'start'))
+    restart = _int(_child_val(lvl, 'lvlRestart'))
+    return ilvl, NumberingLevel(num_fmt, start if start is not None else 0,
+                                _child_val(lvl, 'lvlText') or '', restart)
+
+
+def _child_val(element: Any, name: str) -> Optional[str]:
+    child = element.find(f'{W_NS}{name}')
+    return child.get(f'{W_NS}val') if child is not None else None
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,201 @@
+"""
+Lightweight read access to the parts of a DOCX (zip) package.
+"""
+
+import posixpath
+import zipfile
+from typing import IO, Any, Dict, List, Optional, Union
+
+try:
+    from lxml import etree
+except ImportError:
+    print("Error: Missing required library. Please run: pip install python-docx")
+    import sys
+    sys.exit(1)
+
+try:
+    from docx.oxml.parser import oxml_parser
+except ImportError:  # python-docx < 1.0
+    from docx.oxml import oxml_parser
+
+PR_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+RT_OFFICE_DOCUMENT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+RT_STYLES = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles'
+RT_NUMBERING = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/numbering'
+
+
+class Relationship:
+    """A relationship read from a .rels part"""
+
+    __slots__ = ('rel_id', 'reltype', 'target_ref', 'is_external', 'target_member')
+
+    def __init__(self, rel_id: str, reltype: str, target_ref: str, is_external: bool,
+                 target_member: Optional[str]):
+        self.rel_id = rel_id
+        self.reltype = reltype
+        self.target_ref = target_ref
+        self.is_external = is_external
+        # Zip member name of an internal target
+        self.target_member = target_member
+
+
+class ZipMember:
+    """Lazy handle to a binary zip member; bytes are only read on access"""
+
+    __slots__ = ('package', 'member')
+
+    def __init__(self, package: 'ZipPackage', member: str):
+        self.package = package
+        self.member = member
+
+    @property
+    def blob(self) -> bytes:
+        with self.open() as f:
+            return f.read()
+
+    def open(self) -> IO[bytes]:
+        return self.package.open(self.member)
+
+
+class ZipPackage:
+    """
+    Read-only view of a DOCX package that parses only the parts it is asked for
+
+    Nothing is read up front: XML parts are parsed on request and binary parts
+    (e.g. word/media/*) are only ever opened as zip member streams.
+    """
+
+    def __init__(self, source: Union[str, IO[bytes]]):
+        self._zip = zipfile.ZipFile(source, 'r')
+        self._members: Dict[str, zipfile.ZipInfo] = {
+            info.filename: info for info in self._zip.infolist()}
+        self._rels_cache: Dict[str, Dict[str, Relationship]] = {}
+
+    def __enter__(self) -> 'ZipPackage':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def has_member(self, member: str) -> bool:
+        return member in self._members
+
+    def member_names(self) -> List[str]:
+        return list(self._members)
+
+    def open(self, member: str) -> IO[bytes]:
+        """Open a zip member as a binary stream"""
+        return self._zip.open(member)
+
+    def parse_xml(self, member: str, parser: Any = None) -> Optional[Any]:
+        """Parse an XML part, returning its root element or None if missing"""
+        if member not in self._members:
+            return None
+        with self._zip.open(member) as f:
+            return etree.parse(f, parser).getroot()
+
+    def main_document_member(self) -> str:
+        """Zip member name of the main document part"""
+        for rel in self.relationships('').values():
+            if rel.reltype == RT_OFFICE_DOCUMENT and rel.target_member:
+                return rel.target_member
+        return 'word/document.xml'
+
+    def related_member(self, source_member: str, reltype: str) -> Optional[str]:
+        """Zip member name of the part related to source_member by reltype"""
+        for rel in self.relationships(source_member).values():
+            if rel.reltype == reltype and rel.target_member:
+                return rel.target_member
+        return None
+
+    def relationships(self, source_member: str) -> Dict[str, Relationship]:
+        """Relationships of a part, keyed by relationship ID ('' for the package)"""
+        cached = self._rels_cache.get(source_member)
+        if cached is not None:
+            return cached
+
+        base_dir, name = posixpath.split(source_member)
+        rels_member = posixpath.join(base_dir, '_rels', f"{name}.rels")
+        rels: Dict[str, Relationship] = {}
+
+        root = self.parse_xml(rels_member)
+        if root is not None:
+            for rel in root.iterchildren(f'{PR_NS}Relationship'):
+                rel_id = rel.get('Id')
+                target_ref = rel.get('Target', '')
+                is_external = rel.get('TargetMode') == 'External'
+                target_member = None
+                if not is_external:
+                    if target_ref.startswith('/'):
+                        target_member = target_ref.lstrip('/')
+                    else:
+                        target_member = posixpath.normpath(
+                            posixpath.join(base_dir, target_ref))
+                if rel_id:
+                    rels[rel_id] = Relationship(
+                        rel_id, rel.get('Type', ''), target_ref, is_external, target_member)
+
+        self._rels_cache[source_member] = rels
+        return rels
+
+
+class XmlPart:
+    """XML part of a package, parsed with python-docx's element classes on first access"""
+
+    def __init__(self, package: ZipPackage, member: str):
+        self.package = package
+        self.member = member
+        self._element: Any = None
+
+    @property
+    def element(self) -> Any:
+        if self._element is None:
+            self._element = self.package.parse_xml(self.member, oxml_parser)
+        return self._element
+
+    @property
+    def rels(self) -> Dict[str, Relationship]:
+        return self.package.relationships(self.member)
+
+    def related_part(self, reltype: str) -> Optional['XmlPart']:
+        """Part related to this one by reltype, or None if there is none"""
+        member = self.package.related_member(self.member, reltype)
+        if member is None or not self.package.has_member(member):
+            return None
+        return XmlPart(self.package, member)
+
+
+class PackageDocument:
+    """
+    Stand-in for a python-docx Document that loads only the XML parts it uses
+
+    python-docx reads every part of the package into memory, media included.
+    This exposes the same attributes the converter relies on (element, part,
+    styles) while parts are parsed on first access and binary parts are never
+    read; images are streamed from the zip by the image extractor instead.
+    """
+
+    def __init__(self, package: ZipPackage):
+        self.package = package
+        self.part = XmlPart(package, package.main_document_member())
+        self._styles: Optional[XmlPart] = None
+        self._numbering: Optional[XmlPart] = None
+
+    @property
+    def element(self) -> Any:
+        return self.part.element
+
+    @property
+    def styles(self) -> Optional[XmlPart]:
+        if self._styles is None:
+            self._styles = self.part.related_part(RT_STYLES)
+        return self._styles
+
+    @property
+    def numbering(self) -> Optional[XmlPart]:
+        if self._numbering is None:
+            self._numbering = self.part.related_part(RT_NUMBERING)
+        return self._numbering
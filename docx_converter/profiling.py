@@ -0,0 +1,105 @@
+"""
+Lightweight per-stage timing and counters of a conversion.
+"""
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+COUNTERS = ('paragraphs', 'runs', 'tables', 'cells', 'images', 'bytes_written')
+
+
+class ConversionStats:
+    """
+    Wall and CPU time per conversion stage, plus element counters
+
+    Stage times are exclusive: while a nested stage runs (e.g. 'write' inside
+    'paragraphs') the outer stage is paused, so the stages add up to the total.
+    Only two clock reads are taken per stage switch, cheap enough to stay on.
+    CPU time is measured for the converting thread.
+    """
+
+    def __init__(self):
+        self.wall: Dict[str, float] = {}
+        self.cpu: Dict[str, float] = {}
+        self.calls: Counter = Counter()
+        self.counters: Counter = Counter({name: 0 for name in COUNTERS})
+        self._stack: List[str] = []
+        self._mark_wall = 0.0
+        self._mark_cpu = 0.0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed code as stage name"""
+        self.enter(name)
+        try:
+            yield
+        finally:
+            self.exit()
+
+    def enter(self, name: str) -> None:
+        """Start stage name, pausing the enclosing stage"""
+        self._charge()
+        self._stack.append(name)
+        self.calls[name] += 1
+
+    def exit(self) -> None:
+        """Finish the innermost stage, resuming the enclosing one"""
+        self._charge()
+        self._stack.pop()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable view of the stats"""
+        return {
+            'stages': {
+                name: {
+                    'wall': round(self.wall[name], 6),
+                    'cpu': round(self.cpu.get(name, 0.0), 6),
+                    'calls': self.calls[name],
+                }
+                for name in self.wall
+            },
+            'total': {
+                'wall': round(sum(self.wall.values()), 6),
+                'cpu': round(sum(self.cpu.values()), 6),
+            },
+            'counters': dict(self.counters),
+        }
+
+    def _charge(self) -> None:
+        """Attribute the time since the last switch to the innermost stage"""
+        now_wall = time.perf_counter()
+        now_cpu = time.thread_time()
+        if self._stack:
+            name = self._stack[-1]
+            self.wall[name] = self.wall.get(name, 0.0) + now_wall - self._mark_wall
+            self.cpu[name] = self.cpu.get(name, 0.0) + now_cpu - self._mark_cpu
+        self._mark_wall = now_wall
+        self._mark_cpu = now_cpu
+
+
+def merge_stats(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum several ConversionStats.to_dict() reports"""
+    stages: Dict[str, Dict[str, float]] = {}
+    counters: Counter = Counter()
+    for report in reports:
+        for name, values in report.get('stages', {}).items():
+            total = stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'calls': 0})
+            for key in total:
+                total[key] += values.get(key, 0)
+        counters.update(report.get('counters', {}))
+
+    return {
+        'stages': {name: {'wall': round(values['wall'], 6), 'cpu': round(values['cpu'], 6),
+                          'calls': values['calls']}
+                   for name, values in stages.items()},
+        'total': {
+            'wall': round(sum(values['wall'] for values in stages.values()), 6),
+            'cpu': round(sum(values['cpu'] for values in stages.values()), 6),
+        },
+        'counters': dict(counters),
+    }
@@ -0,0 +1,110 @@
+"""
+Result object of an in-memory conversion.
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .profiling import ConversionStats
+
+logger = logging.getLogger(__name__)
+
+# Logger all converter modules log under
+PACKAGE_LOGGER = __name__.rpartition('.')[0]
+
+
+class ConversionResult:
+    """
+    Markdown and images produced by an in-memory conversion
+
+    Nothing is written to disk unless save() is called. Image bytes are only read
+    when an asset provider is called; with a lazily loaded package they are read
+    from the source, so keep the source open until the result is closed.
+    """
+
+    def __init__(self, markdown: str, assets: Dict[str, Callable[[], bytes]],
+                 warnings: List[str], package: Any = None,
+                 stats: Optional[ConversionStats] = None):
+        """
+        Args:
+            markdown: Converted Markdown content
+            assets: Image file name (as referenced under ./assets/) -> byte provider
+            warnings: Warnings logged during the conversion
+            package: Opened package the providers read from (closed by close())
+            stats: Per-stage timing and counters of the conversion
+        """
+        self.markdown = markdown
+        self.assets = assets
+        self.warnings = warnings
+        self.stats = stats if stats is not None else ConversionStats()
+        self._package = package
+
+    def __enter__(self) -> 'ConversionResult':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the source package; asset providers cannot be used afterwards"""
+        if self._package is not None:
+            self._package.close()
+            self._package = None
+
+    def save(self, output_path: str) -> None:
+        """
+        Write the Markdown file and its images (into assets/ next to it)
+
+        Args:
+            output_path: Markdown file path
+        """
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        if self.assets:
+            assets_dir = os.path.join(output_dir, 'assets')
+            os.makedirs(assets_dir, exist_ok=True)
+            for name, provider in self.assets.items():
+                with open(os.path.join(assets_dir, name), 'wb') as f:
+                    f.write(provider())
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(self.markdown)
+
+        logger.info(f"Saved conversion result: {output_path}")
+
+
+class _ThreadWarningCollector(logging.Handler):
+    """Collect warning records emitted by a single thread"""
+
+    def __init__(self, thread_id: int):
+        super().__init__(logging.WARNING)
+        self.thread_id = thread_id
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.thread == self.thread_id:
+            self.messages.append(record.getMessage())
+
+
+@contextmanager
+def capture_warnings(logger_name: Optional[str] = None) -> Iterator[List[str]]:
+    """
+    Collect warnings the converter logs from the current thread
+
+    Concurrent conversions in other threads do not leak into the list.
+
+    Args:
+        logger_name: Logger to listen on (defaults to the converter package logger)
+    """
+    collector = _ThreadWarningCollector(threading.get_ident())
+    target = logging.getLogger(logger_name or PACKAGE_LOGGER)
+    target.addHandler(collector)
+    try:
+        yield collector.messages
+    finally:
+        target.removeHandler(collector)
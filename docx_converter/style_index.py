@@ -0,0 +1,237 @@
+"""
+Style index module for resolving Word styles and inherited run formatting.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from .utils import extract_heading_level
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+_FALSE_VALUES = ('0', 'false', 'off', 'none')
+
+
+class RunFormat:
+    """Effective run formatting after style inheritance"""
+
+    __slots__ = ('bold', 'italic', 'underline', 'size')
+
+    def __init__(self, bold: Optional[bool] = None, italic: Optional[bool] = None,
+                 underline: Optional[bool] = None, size: Optional[float] = None):
+        self.bold = bold
+        self.italic = italic
+        self.underline = underline
+        self.size = size
+
+    def merged_over(self, base: 'RunFormat') -> 'RunFormat':
+        """Return a format where unset properties are taken from base"""
+        return RunFormat(
+            base.bold if self.bold is None else self.bold,
+            base.italic if self.italic is None else self.italic,
+            base.underline if self.underline is None else self.underline,
+            base.size if self.size is None else self.size,
+        )
+
+
+class StyleInfo:
+    """Resolved information about a single style"""
+
+    __slots__ = ('style_id', 'name', 'style_type', 'heading_level',
+                 'is_list', 'run_format', 'num_id', 'ilvl')
+
+    def __init__(self, style_id: Optional[str], name: str, style_type: str,
+                 run_format: RunFormat, num_id: Optional[int] = None,
+                 ilvl: Optional[int] = None):
+        self.style_id = style_id
+        # Normalized (lower case) style name
+        self.name = name
+        self.style_type = style_type
+        self.heading_level = extract_heading_level(
+            name) if 'heading' in name else None
+        self.is_list = 'list' in name or 'bullet' in name
+        # Run formatting inherited through the basedOn chain and document defaults
+        self.run_format = run_format
+        # Numbering (numPr) of the style, inherited through the basedOn chain
+        self.num_id = num_id
+        self.ilvl = ilvl
+
+
+EMPTY_STYLE = StyleInfo(None, '', 'paragraph', RunFormat())
+
+
+def _on_off(element) -> Optional[bool]:
+    """Read a toggle property such as <w:b/> or <w:i w:val="0"/>"""
+    val = element.get(f'{W_NS}val')
+    if val is None:
+        return True
+    return val.lower() not in _FALSE_VALUES
+
+
+def parse_run_properties(rPr) -> Tuple[RunFormat, Optional[str]]:
+    """
+    Read the formatting set directly in a <w:rPr> element
+
+    Returns:
+        (run format, character style id)
+    """
+    run_format = RunFormat()
+    char_style_id = None
+    if rPr is None:
+        return run_format, char_style_id
+
+    for child in rPr:
+        tag = child.tag
+        if tag == f'{W_NS}b':
+            run_format.bold = _on_off(child)
+        elif tag == f'{W_NS}i':
+            run_format.italic = _on_off(child)
+        elif tag == f'{W_NS}u':
+            run_format.underline = _on_off(child)
+        elif tag == f'{W_NS}sz':
+            val = child.get(f'{W_NS}val')
+            if val is not None:
+                try:
+                    # Size is stored in half-points
+                    run_format.size = int(val) / 2.0
+                except ValueError:
+                    pass
+        elif tag == f'{W_NS}rStyle':
+            char_style_id = child.get(f'{W_NS}val')
+
+    return run_format, char_style_id
+
+
+def parse_numbering_properties(numPr) -> Tuple[Optional[int], Optional[int]]:
+    """Read (numId, ilvl) of a <w:numPr> element; None for values not set"""
+    if numPr is None:
+        return None, None
+    return (_int_val(numPr.find(f'{W_NS}numId')),
+            _int_val(numPr.find(f'{W_NS}ilvl')))
+
+
+def _int_val(element) -> Optional[int]:
+    if element is None:
+        return None
+    try:
+        return int(element.get(f'{W_NS}val'))
+    except (TypeError, ValueError):
+        return None
+
+
+class StyleIndex:
+    """Per-document index of styles built once from styles.xml"""
+
+    def __init__(self, styles_element: Any = None):
+        self._raw: Dict[str, Tuple[str, str, Optional[str], RunFormat,
+                                   Tuple[Optional[int], Optional[int]]]] = {}
+        self.styles: Dict[str, StyleInfo] = {}
+        self.default_paragraph_style = EMPTY_STYLE
+        self.default_run_format = RunFormat()
+        self._run_format_cache: Dict[Tuple[Optional[str], Optional[str]], RunFormat] = {}
+
+        if styles_element is not None:
+            self._build(styles_element)
+
+    @classmethod
+    def from_document(cls, doc: Any) -> 'StyleIndex':
+        """Build the index from a python-docx Document"""
+        try:
+            return cls(doc.styles.element)
+        except (AttributeError, KeyError):
+            return cls()
+
+    def _build(self, styles_element) -> None:
+        """Parse styles.xml once and resolve every style"""
+        defaults = styles_element.find(f'{W_NS}docDefaults')
+        if defaults is not None:
+            rPr = defaults.find(f'{W_NS}rPrDefault/{W_NS}rPr')
+            self.default_run_format, _ = parse_run_properties(rPr)
+
+        default_paragraph_id = None
+        for style in styles_element.iterchildren(f'{W_NS}style'):
+            style_id = style.get(f'{W_NS}styleId')
+            if not style_id:
+                continue
+            style_type = style.get(f'{W_NS}type', 'paragraph')
+            name_elem = style.find(f'{W_NS}name')
+            name = name_elem.get(f'{W_NS}val', '') if name_elem is not None else ''
+            based_on_elem = style.find(f'{W_NS}basedOn')
+            based_on = based_on_elem.get(
+                f'{W_NS}val') if based_on_elem is not None else None
+            run_format, _ = parse_run_properties(style.find(f'{W_NS}rPr'))
+            numbering = parse_numbering_properties(
+                style.find(f'{W_NS}pPr/{W_NS}numPr'))
+            self._raw[style_id] = (name.lower(), style_type, based_on, run_format, numbering)
+
+            if style_type == 'paragraph' and _on_off_attr(style.get(f'{W_NS}default')):
+                default_paragraph_id = style_id
+
+        for style_id in self._raw:
+            self._resolve(style_id, set())
+
+        if default_paragraph_id in self.styles:
+            self.default_paragraph_style = self.styles[default_paragraph_id]
+
+    def _resolve(self, style_id: str, seen: set) -> RunFormat:
+        """Resolve the inherited run format of a style, following basedOn"""
+        if style_id in self.styles:
+            return self.styles[style_id].run_format
+
+        name, style_type, based_on, run_format, (num_id, ilvl) = self._raw[style_id]
+        seen.add(style_id)
+        if based_on in self._raw and based_on not in seen:
+            base_format = self._resolve(based_on, seen)
+            base = self.styles[based_on]
+            if num_id is None:
+                num_id = base.num_id
+            if ilvl is None:
+                ilvl = base.ilvl
+        else:
+            base_format = self.default_run_format if style_type != 'character' else RunFormat()
+        resolved = run_format.merged_over(base_format)
+
+        self.styles[style_id] = StyleInfo(
+            style_id, name, style_type, resolved, num_id, ilvl)
+        return resolved
+
+    def paragraph_style(self, style_id: Optional[str]) -> StyleInfo:
+        """Look up a paragraph style, falling back to the default paragraph style"""
+        style = self.styles.get(style_id) if style_id else None
+        if style is None or style.style_type != 'paragraph':
+            return self.default_paragraph_style
+        return style
+
+    def paragraph_style_of(self, p_element) -> StyleInfo:
+        """Look up the style of a <w:p> element"""
+        pPr = p_element.find(f'{W_NS}pPr')
+        if pPr is not None:
+            pStyle = pPr.find(f'{W_NS}pStyle')
+            if pStyle is not None:
+                return self.paragraph_style(pStyle.get(f'{W_NS}val'))
+        return self.default_paragraph_style
+
+    def effective_run_format(self, r_element, paragraph_style: StyleInfo) -> RunFormat:
+        """
+        Get the run formatting of a <w:r> element including inherited values
+
+        Direct formatting wins over the character style, which wins over the
+        paragraph style and the document defaults.
+        """
+        direct, char_style_id = parse_run_properties(
+            r_element.find(f'{W_NS}rPr'))
+
+        key = (paragraph_style.style_id, char_style_id)
+        base = self._run_format_cache.get(key)
+        if base is None:
+            base = paragraph_style.run_format
+            char_style = self.styles.get(
+                char_style_id) if char_style_id else None
+            if char_style is not None and char_style.style_type == 'character':
+                base = char_style.run_format.merged_over(base)
+            self._run_format_cache[key] = base
+
+        return direct.merged_over(base)
+
+
+def _on_off_attr(value: Optional[str]) -> bool:
+    return value is not None and value.lower() not in _FALSE_VALUES
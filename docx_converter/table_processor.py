@@ -2,30 +2,68 @@
 Table processing module for converting Word tables to Markdown.
 """
 
-from typing import List
+from typing import Any, Iterator, List, Optional, Tuple
+
+from .formatting import TextFormatter
+from .markdown_writer import MarkdownWriter
 
 try:
-    from docx.table import Table
+    from docx.text.paragraph import Paragraph
 except ImportError:
     print("Error: Missing required library. Please run: pip install python-docx")
     import sys
     sys.exit(1)
 
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_TBL = f'{W_NS}tbl'
+W_TR = f'{W_NS}tr'
+W_TC = f'{W_NS}tc'
+W_P = f'{W_NS}p'
+W_VAL = f'{W_NS}val'
+# Content controls and custom XML may wrap rows, cells and cell content
+W_WRAPPERS = (f'{W_NS}sdt', f'{W_NS}sdtContent', f'{W_NS}customXml')
+
 
 class TableProcessor:
     """Handles table processing and conversion"""
 
-    def __init__(self, output_lines: List[str]):
+    def __init__(self, output_lines: MarkdownWriter, text_formatter: Optional[TextFormatter] = None):
         self.output_lines = output_lines
+        self.text_formatter = text_formatter or TextFormatter()
+
+    def convert_table(self, table: Any) -> int:
+        """
+        Convert table to Markdown format
+
+        Rows are read straight from <w:tr>/<w:tc> and written as soon as they are
+        rendered. A cell spanning several grid columns (gridSpan) or continuing a
+        vertical merge (vMerge) shows its text once; the other grid positions it
+        covers are left empty so columns stay aligned. The table is as wide as its
+        widest row (or its grid, if wider), so a missing or stale <w:tblGrid>
+        doesn't cut off cells.
+
+        Args:
+            table: python-docx Table or <w:tbl> element
+
+        Returns:
+            Number of cells converted
+        """
+        tbl = getattr(table, '_tbl', table)
+        grid_width = len(tbl.findall(f'{W_NS}tblGrid/{W_NS}gridCol'))
+        rows = list(_iter_content(tbl, W_TR))
+        # Widths are read from gridBefore/gridSpan/gridAfter, without rendering
+        column_count = max([grid_width] + [_row_width(tr) for tr in rows])
+        cell_count = 0
 
-    def convert_table(self, table: Table) -> None:
-        """Convert table to Markdown format"""
         self.output_lines.append('')  # Blank line before table
 
         # Convert table rows
-        for i, row in enumerate(table.rows):
-            cells = [cell.text.strip().replace('\n', ' ')
-                     for cell in row.cells]
+        for i, tr in enumerate(rows):
+            cells = self._render_row(tr)
+            cell_count += len(cells)
+
+            # Pad to the table's width so it stays rectangular
+            cells.extend([''] * (column_count - len(cells)))
 
             # Table row
             self.output_lines.append('| ' + ' | '.join(cells) + ' |')
@@ -36,3 +74,89 @@ class TableProcessor:
                 self.output_lines.append(separator)
 
         self.output_lines.append('')  # Blank line after table
+        return cell_count
+
+    def _render_row(self, tr: Any) -> List[str]:
+        """Render one row as one string per grid column"""
+        cells = [''] * _row_property(tr, 'gridBefore')
+
+        for tc in _iter_content(tr, W_TC):
+            span, continues_merge = _cell_span(tc)
+            cells.append('' if continues_merge else self._render_cell(tc))
+            cells.extend([''] * (span - 1))
+
+        cells.extend([''] * _row_property(tr, 'gridAfter'))
+        return cells
+
+    def _render_cell(self, tc: Any) -> str:
+        """Render a cell's paragraphs (nested tables flattened) on one line"""
+        parts = []
+        for p in _iter_cell_paragraphs(tc):
+            text = self.text_formatter.convert_paragraph_formatting(
+                Paragraph(p, None))
+            if text.strip():
+                parts.append(text.strip())
+
+        text = ' '.join(parts).replace('\n', ' ')
+        # A literal pipe would end the cell
+        return text.replace('|', '\\|')
+
+
+def _iter_content(parent: Any, tag: str) -> Iterator[Any]:
+    """Yield the tag children of parent, looking through content control wrappers"""
+    for child in parent.iterchildren():
+        if child.tag == tag:
+            yield child
+        elif child.tag in W_WRAPPERS:
+            yield from _iter_content(child, tag)
+
+
+def _iter_cell_paragraphs(tc: Any) -> Iterator[Any]:
+    """Yield a cell's paragraphs in order, including those of nested tables"""
+    for child in tc.iterchildren():
+        if child.tag == W_P:
+            yield child
+        elif child.tag == W_TBL:
+            for tr in _iter_content(child, W_TR):
+                for nested_tc in _iter_content(tr, W_TC):
+                    yield from _iter_cell_paragraphs(nested_tc)
+        elif child.tag in W_WRAPPERS:
+            yield from _iter_cell_paragraphs(child)
+
+
+def _cell_span(tc: Any) -> Tuple[int, bool]:
+    """Grid columns a cell covers and whether it continues a vertical merge"""
+    tcPr = tc.find(f'{W_NS}tcPr')
+    if tcPr is None:
+        return 1, False
+
+    span = 1
+    grid_span = tcPr.find(f'{W_NS}gridSpan')
+    if grid_span is not None:
+        span = max(_int(grid_span.get(W_VAL), 1), 1)
+    continues_merge = False
+    v_merge = tcPr.find(f'{W_NS}vMerge')
+    if v_merge is not None:
+        continues_merge = v_merge.get(W_VAL, 'continue') == 'continue'
+    return span, continues_merge
+
+
+def _row_width(tr: Any) -> int:
+    """Number of grid columns a row covers"""
+    return (_row_property(tr, 'gridBefore') + _row_property(tr, 'gridAfter')
+            + sum(_cell_span(tc)[0] for tc in _iter_content(tr, W_TC)))
+
+
+def _row_property(tr: Any, name: str) -> int:
+    """Integer value of a row property such as gridBefore/gridAfter (0 if absent)"""
+    element = tr.find(f'{W_NS}trPr/{W_NS}{name}')
+    if element is None:
+        return 0
+    return max(_int(element.get(W_VAL), 0), 0)
+
+
+def _int(value: Optional[str], default: int) -> int:
+    try:
+        return int(value) if value is not None else default
+    except ValueError:
+        return default
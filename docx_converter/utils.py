@@ -3,39 +3,62 @@ Utility functions for DOCX to Markdown conversion.
 """
 
 import re
-from typing import Dict, List, Optional, Tuple
-
-try:
-    from docx.text.paragraph import Paragraph
-except ImportError:
-    print("Error: Missing required library. Please run: pip install python-docx")
-    import sys
-    sys.exit(1)
-
-
-def clean_markdown_content(output_lines: List[str]) -> str:
+from collections import Counter
+from typing import Any, Dict
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_R = f'{W_NS}r'
+W_T = f'{W_NS}t'
+W_BR = f'{W_NS}br'
+W_HYPERLINK = f'{W_NS}hyperlink'
+W_TYPE = f'{W_NS}type'
+
+# Run content elements with a fixed text equivalent (w:t and w:br are handled apart)
+RUN_CONTENT_TEXT = {
+    f'{W_NS}tab': '\t',
+    f'{W_NS}ptab': '\t',
+    f'{W_NS}cr': '\n',
+    f'{W_NS}noBreakHyphen': '-',
+}
+
+
+def get_run_text(r_element: Any) -> str:
     """
-    Clean and format Markdown content
-
-    Args:
-        output_lines: List of output lines
+    Get the text of a <w:r> element, same as python-docx's run text
 
-    Returns:
-        Cleaned Markdown content string
+    Walks the run's children directly; python-docx evaluates an XPath union per
+    run, which dominates on paragraphs with many runs.
     """
-    # Generate Markdown content
-    markdown_content = '\n'.join(output_lines)
-
-    # Clean up extra blank lines - merge multiple consecutive blank lines into single blank line
-    markdown_content = re.sub(r'\n{3,}', '\n\n', markdown_content)
+    parts = []
+    for child in r_element.iterchildren():
+        tag = child.tag
+        if tag == W_T:
+            parts.append(child.text or '')
+        elif tag == W_BR:
+            # Only text wrapping breaks are line breaks; page/column breaks are ''
+            if child.get(W_TYPE, 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        else:
+            text = RUN_CONTENT_TEXT.get(tag)
+            if text:
+                parts.append(text)
+    return ''.join(parts)
 
-    # Remove blank lines at beginning and end
-    markdown_content = markdown_content.strip()
 
-    # Add extra blank line at the end
-    markdown_content += '\n'
+def get_paragraph_text(p_element: Any) -> str:
+    """
+    Get the text of a <w:p> element (runs and hyperlinks), same as python-docx's paragraph text
 
-    return markdown_content
+    python-docx selects runs and hyperlinks with an XPath union whose node-set
+    merge is quadratic in the number of runs.
+    """
+    parts = []
+    for child in p_element.iterchildren(W_R, W_HYPERLINK):
+        if child.tag == W_R:
+            parts.append(get_run_text(child))
+        else:
+            parts.extend(get_run_text(r) for r in child.iterchildren(W_R))
+    return ''.join(parts)
 
 
 def extract_heading_level(style_name: str) -> int:
@@ -47,13 +70,6 @@ def extract_heading_level(style_name: str) -> int:
     return 1
 
 
-def merge_adjacent_tags(text: str) -> str:
-    """Merge adjacent HTML tags of the same type"""
-    # Merge adjacent underline tags
-    text = re.sub(r'</u><u>', '', text)
-    return text
-
-
 def is_list_marker_text(text: str) -> bool:
     """Check if text starts with list markers"""
     list_markers = ['•', '◦', '▪', '▫', '‣', '-', '*', '+']
@@ -78,66 +94,27 @@ def remove_list_markers(text: str) -> str:
     return text
 
 
-def get_paragraph_font_size(paragraph: Paragraph) -> Optional[float]:
-    """
-    Get the font size of a paragraph in points.
-    Returns the most common font size in the paragraph, or None if not found.
-    """
-    font_sizes = []
-
-    for run in paragraph.runs:
-        if run.font.size:
-            # Convert from Twips to Points (1 point = 20 twips)
-            size_in_points = run.font.size.pt
-            font_sizes.append(size_in_points)
-
-    if not font_sizes:
-        return None
-
-    # Return the most common font size
-    from collections import Counter
-    return Counter(font_sizes).most_common(1)[0][0]
-
-
-def is_paragraph_uniform_font_size(paragraph: Paragraph) -> bool:
-    """
-    Check if all text in the paragraph has the same font size.
-    """
-    font_sizes = set()
-
-    for run in paragraph.runs:
-        if run.font.size and run.text.strip():  # Only consider runs with text
-            size_in_points = run.font.size.pt
-            font_sizes.add(size_in_points)
-
-    # Paragraph is uniform if it has at most one font size
-    return len(font_sizes) <= 1
-
-
-def analyze_font_size_hierarchy(paragraphs_with_sizes: List[Tuple[Paragraph, float]]) -> Dict[float, int]:
+def analyze_font_size_hierarchy(size_counts: Counter) -> Dict[float, int]:
     """
     Analyze font sizes and assign heading levels based on size hierarchy.
 
     Args:
-        paragraphs_with_sizes: List of (paragraph, font_size) tuples
+        size_counts: Counter mapping font_size to the number of paragraphs using it
 
     Returns:
         Dictionary mapping font_size to heading_level (1-6, or 0 for normal text)
     """
-    if not paragraphs_with_sizes:
+    if not size_counts:
         return {}
 
     # Get unique font sizes, sorted in descending order (largest first)
-    unique_sizes = sorted(
-        set(size for _, size in paragraphs_with_sizes), reverse=True)
+    unique_sizes = sorted(size_counts, reverse=True)
 
     # If only one size, it's probably normal text
     if len(unique_sizes) == 1:
         return {unique_sizes[0]: 0}
 
     # Determine the baseline size (most common size, likely normal text)
-    from collections import Counter
-    size_counts = Counter(size for _, size in paragraphs_with_sizes)
     baseline_size = size_counts.most_common(1)[0][0]
 
     # Assign heading levels to sizes larger than baseline
@@ -152,36 +129,3 @@ def analyze_font_size_hierarchy(paragraphs_with_sizes: List[Tuple[Paragraph, flo
             size_to_level[size] = 0  # Normal text
 
     return size_to_level
-
-
-def find_font_size_based_headings(doc) -> Dict[float, int]:
-    """
-    Analyze the entire document to find potential headings based on font size.
-    Returns a mapping of font_size -> heading_level.
-    """
-    candidates = []
-
-    # First pass: collect all paragraphs with uniform font sizes
-    for element in doc.element.body:
-        if element.tag.endswith('p'):  # Paragraph
-            paragraph = Paragraph(element, doc)
-            text = paragraph.text.strip()
-
-            # Skip empty paragraphs
-            if not text:
-                continue
-
-            # Skip paragraphs with existing heading styles
-            style_name = paragraph.style.name.lower(
-            ) if paragraph.style and paragraph.style.name else ''
-            if 'heading' in style_name or 'title' in style_name:
-                continue
-
-            # Check if paragraph has uniform font size
-            if is_paragraph_uniform_font_size(paragraph):
-                font_size = get_paragraph_font_size(paragraph)
-                if font_size:
-                    candidates.append((paragraph, font_size))
-
-    # Analyze and assign heading levels
-    return analyze_font_size_hierarchy(candidates)
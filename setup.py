@@ -20,7 +20,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/hnrobert/word2md",
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",